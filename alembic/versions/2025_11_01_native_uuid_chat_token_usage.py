@@ -0,0 +1,50 @@
+"""Convert conversations, messages and token_usage ids to native uuid
+
+Revision ID: 2025_11_01_native_uuid_chat_token_usage
+Revises: 2025_11_02_encrypt_oauth_tokens
+Create Date: 2025-11-01 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2025_11_01_native_uuid_chat_token_usage'
+down_revision = '2025_11_02_encrypt_oauth_tokens'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # messages.conversation_id references conversations.id, so the FK has to be
+    # dropped while both sides change type and re-created afterwards.
+    op.drop_constraint('messages_conversation_id_fkey', 'messages', type_='foreignkey')
+
+    op.execute("ALTER TABLE conversations ALTER COLUMN id TYPE uuid USING id::uuid")
+    op.execute("""
+    ALTER TABLE messages
+        ALTER COLUMN id TYPE uuid USING id::uuid,
+        ALTER COLUMN conversation_id TYPE uuid USING conversation_id::uuid
+    """)
+    op.execute("ALTER TABLE token_usage ALTER COLUMN id TYPE uuid USING id::uuid")
+
+    op.create_foreign_key(
+        'messages_conversation_id_fkey', 'messages', 'conversations',
+        ['conversation_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade():
+    op.drop_constraint('messages_conversation_id_fkey', 'messages', type_='foreignkey')
+
+    op.execute("ALTER TABLE token_usage ALTER COLUMN id TYPE varchar USING id::text")
+    op.execute("""
+    ALTER TABLE messages
+        ALTER COLUMN id TYPE varchar USING id::text,
+        ALTER COLUMN conversation_id TYPE varchar USING conversation_id::text
+    """)
+    op.execute("ALTER TABLE conversations ALTER COLUMN id TYPE varchar USING id::text")
+
+    op.create_foreign_key(
+        'messages_conversation_id_fkey', 'messages', 'conversations',
+        ['conversation_id'], ['id'], ondelete='CASCADE'
+    )
@@ -0,0 +1,80 @@
+"""Store OAuth access/refresh tokens as encrypted BYTEA
+
+Revision ID: 2025_11_02_encrypt_oauth_tokens
+Revises: add_oauth_fields_migration
+Create Date: 2025-11-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.security import encrypt_oauth_token, decrypt_oauth_token
+
+# revision identifiers, used by Alembic.
+revision = '2025_11_02_encrypt_oauth_tokens'
+# add_oauth_fields_migration creates the token columns as varchar
+down_revision = 'add_oauth_fields_migration'
+branch_labels = None
+depends_on = None
+
+
+def _fetch_tokens(conn):
+    return conn.execute(sa.text("""
+    SELECT id, oauth_access_token, oauth_refresh_token
+    FROM users
+    WHERE oauth_access_token IS NOT NULL OR oauth_refresh_token IS NOT NULL
+    """)).fetchall()
+
+
+def upgrade():
+    conn = op.get_bind()
+    rows = _fetch_tokens(conn)
+
+    # Plaintext tokens cannot be encrypted server-side, so the columns are
+    # retyped empty and refilled with ciphertext produced in Python
+    op.execute("""
+    ALTER TABLE users
+        ALTER COLUMN oauth_access_token TYPE bytea USING NULL,
+        ALTER COLUMN oauth_refresh_token TYPE bytea USING NULL
+    """)
+
+    encrypt = lambda token: encrypt_oauth_token(token) if token is not None else None
+    if rows:
+        conn.execute(
+            sa.text("""
+            UPDATE users
+            SET oauth_access_token = :access_token, oauth_refresh_token = :refresh_token
+            WHERE id = :id
+            """),
+            [
+                {"id": row.id, "access_token": encrypt(row.oauth_access_token),
+                 "refresh_token": encrypt(row.oauth_refresh_token)}
+                for row in rows
+            ]
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    rows = _fetch_tokens(conn)
+
+    op.execute("""
+    ALTER TABLE users
+        ALTER COLUMN oauth_access_token TYPE varchar USING NULL,
+        ALTER COLUMN oauth_refresh_token TYPE varchar USING NULL
+    """)
+
+    decrypt = lambda blob: decrypt_oauth_token(bytes(blob)) if blob is not None else None
+    if rows:
+        conn.execute(
+            sa.text("""
+            UPDATE users
+            SET oauth_access_token = :access_token, oauth_refresh_token = :refresh_token
+            WHERE id = :id
+            """),
+            [
+                {"id": row.id, "access_token": decrypt(row.oauth_access_token),
+                 "refresh_token": decrypt(row.oauth_refresh_token)}
+                for row in rows
+            ]
+        )
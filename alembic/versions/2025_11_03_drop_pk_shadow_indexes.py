@@ -0,0 +1,40 @@
+"""Drop ix_<table>_id indexes that duplicate the primary key index
+
+Revision ID: 2025_11_03_drop_pk_shadow_indexes
+Revises: 2025_11_01_native_uuid_chat_token_usage
+Create Date: 2025-11-03 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2025_11_03_drop_pk_shadow_indexes'
+down_revision = '2025_11_01_native_uuid_chat_token_usage'
+branch_labels = None
+depends_on = None
+
+# Postgres already backs every PRIMARY KEY with a unique btree on id, so these
+# non-unique copies only add write and WAL overhead.
+TABLES = [
+    'user_preferences',
+    'usage_statistics',
+    'token_usage',
+    'token_usage_summary',
+    'generated_content',
+    'content_feedback',
+    'job_applications',
+    'documents',
+    'document_chunks',
+    'conversations',
+    'messages',
+]
+
+
+def upgrade():
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_id")
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_id ON {table} (id)")
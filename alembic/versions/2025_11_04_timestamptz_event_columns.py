@@ -0,0 +1,47 @@
+"""Store event timestamps as timestamptz
+
+Revision ID: 2025_11_04_timestamptz_event_columns
+Revises: 2025_11_03_drop_pk_shadow_indexes
+Create Date: 2025-11-04 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2025_11_04_timestamptz_event_columns'
+down_revision = '2025_11_03_drop_pk_shadow_indexes'
+branch_labels = None
+depends_on = None
+
+# Existing values were written as naive UTC (datetime.utcnow / now() on a UTC
+# server), so they are reinterpreted AT TIME ZONE 'UTC'.
+EVENT_COLUMNS = {
+    'user_preferences': ['created_at', 'updated_at'],
+    'usage_statistics': ['last_reset_date', 'created_at', 'updated_at'],
+    'token_usage': ['timestamp'],
+    'token_usage_summary': ['created_at', 'updated_at'],
+    'generated_content': ['created_at', 'updated_at'],
+    'content_feedback': ['created_at', 'updated_at'],
+    'job_applications': ['created_at', 'updated_at'],
+    'documents': ['upload_date'],
+    'conversations': ['created_at', 'updated_at'],
+    'messages': ['created_at'],
+}
+
+
+def upgrade():
+    for table, columns in EVENT_COLUMNS.items():
+        alterations = ", ".join(
+            f'ALTER COLUMN "{column}" TYPE timestamptz USING "{column}" AT TIME ZONE \'UTC\''
+            for column in columns
+        )
+        op.execute(f"ALTER TABLE {table} {alterations}")
+
+
+def downgrade():
+    for table, columns in EVENT_COLUMNS.items():
+        alterations = ", ".join(
+            f'ALTER COLUMN "{column}" TYPE timestamp USING "{column}" AT TIME ZONE \'UTC\''
+            for column in columns
+        )
+        op.execute(f"ALTER TABLE {table} {alterations}")
@@ -0,0 +1,33 @@
+"""Store large content/metadata payloads out of line without compression
+
+Revision ID: 2025_11_05_external_storage_large_payloads
+Revises: 2025_11_04_timestamptz_event_columns
+Create Date: 2025-11-05 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2025_11_05_external_storage_large_payloads'
+down_revision = '2025_11_04_timestamptz_event_columns'
+branch_labels = None
+depends_on = None
+
+# LLM output and document metadata barely compress, so pglz only burns CPU on
+# insert before TOAST gives up. EXTERNAL keeps out-of-line storage but skips
+# the compression attempt. Only rows written after the change are affected.
+COLUMNS = [
+    ('generated_content', 'content'),
+    ('documents', 'document_metadata'),
+    ('document_chunks', 'metadata'),
+]
+
+
+def upgrade():
+    for table, column in COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" SET STORAGE EXTERNAL')
+
+
+def downgrade():
+    for table, column in COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" SET STORAGE EXTENDED')
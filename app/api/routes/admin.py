@@ -10,7 +10,7 @@ from app.schemas.admin import UserStatistics, AdminDashboardStats
 from app.schemas.admin_user import UserStatusUpdate, AdminUserCreate
 from app.services.admin import verify_admin_token
 from app.services.admin_stats import get_user_statistics, get_admin_dashboard_stats
-from app.services.user import get_users, get_user_by_id, update_user_status, create_user, get_user_by_email, delete_user
+from app.services.user import get_users, get_user_by_id, update_user_status, create_user, email_exists, delete_user
 
 router = APIRouter()
 
@@ -208,8 +208,7 @@ def create_user_admin(
     - subscription: Subscription information (optional)
     """
     # Check if user with this email already exists
-    existing_user = get_user_by_email(db, email=user_in.email)
-    if existing_user:
+    if email_exists(db, email=user_in.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
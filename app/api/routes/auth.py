@@ -26,7 +26,7 @@ from app.schemas.email import (
 from app.schemas.message import Message
 
 # Service imports
-from app.services.user import get_user_by_email, create_user, authenticate_user, verify_user_email
+from app.services.user import get_user_by_email, email_exists, create_user, authenticate_user, verify_user_email
 from app.services.auth import (
     create_access_token,
     create_refresh_token,
@@ -93,8 +93,7 @@ def register(
     Register a new user with optional subscription information.
     """
     # Check if user with this email already exists
-    user = get_user_by_email(db, email=user_in.email)
-    if user:
+    if email_exists(db, email=user_in.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
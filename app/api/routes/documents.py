@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 from uuid import uuid4
 import os
 import shutil
+import hashlib
 from datetime import datetime
 import tempfile
 from pathlib import Path
@@ -14,7 +15,9 @@ from pathlib import Path
 from app.api.deps import get_current_active_user
 from app.models.user import User
 from app.services import openai_service
+from app.services import document_status
 from app.core.config import settings
+from app.utils.uploads import save_upload_file
 
 router = APIRouter()
 
@@ -70,9 +73,10 @@ async def upload_document(
         original_filename = file.filename or f"document{file_extension}"
         file_path = doc_dir / original_filename
         
-        # Save uploaded file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream uploaded file to disk, fingerprinting the content on the way
+        hasher = hashlib.sha256()
+        file_size = await save_upload_file(file, file_path, hasher)
+        content_hash = hasher.hexdigest()
             
         # Parse metadata if provided
         meta_dict = {}
@@ -93,14 +97,36 @@ async def upload_document(
             "conversation_id": conversation_id
         })
         
-        # Schedule background processing
+        # Identical content was already processed for this user: reuse its chunks
+        duplicate_of = await document_status.find_document_by_content_hash(str(current_user.id), content_hash)
+        if duplicate_of:
+            try:
+                await openai_service.clone_document_chunks(duplicate_of, document_id, meta_dict)
+                await document_status.update_document_status(document_id, str(current_user.id), "ready")
+                await document_status.record_content_hash(str(current_user.id), content_hash, document_id)
+                return {
+                    "document_id": document_id,
+                    "file_name": original_filename,
+                    "file_type": file.content_type,
+                    "file_size": file_size,
+                    "upload_date": meta_dict["upload_date"],
+                    "status": "ready",
+                    "message": "Document uploaded successfully; identical content was already processed."
+                }
+            except FileNotFoundError:
+                # Source chunks are gone; fall through to regular processing
+                pass
+        
+        # Record status and schedule background processing
+        await document_status.update_document_status(document_id, str(current_user.id), "uploaded")
         background_tasks.add_task(
             process_document_background,
             str(file_path),
             file.content_type,
             document_id,
             str(current_user.id),
-            meta_dict
+            meta_dict,
+            content_hash
         )
         
         # Return immediate response
@@ -108,7 +134,7 @@ async def upload_document(
             "document_id": document_id,
             "file_name": original_filename,
             "file_type": file.content_type,
-            "file_size": os.path.getsize(file_path),
+            "file_size": file_size,
             "upload_date": meta_dict["upload_date"],
             "status": "uploaded",
             "message": "Document uploaded successfully and queued for processing."
@@ -148,12 +174,11 @@ async def get_document(
         original_file = files[0]
         
         # Check if processing is complete
-        chunks_dir = Path("./document_chunks")
-        chunks_file = chunks_dir / f"{document_id}_chunks.json"
-        
-        status = "processing"
-        if chunks_file.exists():
-            status = "ready"
+        status = await document_status.get_document_status(document_id)
+        if status is None:
+            # Documents processed before status tracking only have their chunks file
+            chunks_file = Path("./document_chunks") / f"{document_id}_chunks.json"
+            status = "ready" if chunks_file.exists() else "processing"
             
         # Return document metadata
         return {
@@ -185,6 +210,7 @@ async def list_documents(
             return {"documents": []}
             
         # Get all document directories
+        statuses = await document_status.get_user_document_statuses(str(current_user.id))
         documents = []
         for doc_dir in user_dir.iterdir():
             if doc_dir.is_dir():
@@ -198,12 +224,10 @@ async def list_documents(
                 original_file = files[0]
                 
                 # Check if processing is complete
-                chunks_dir = Path("./document_chunks")
-                chunks_file = chunks_dir / f"{document_id}_chunks.json"
-                
-                status = "processing"
-                if chunks_file.exists():
-                    status = "ready"
+                status = statuses.get(document_id)
+                if status is None:
+                    chunks_file = Path("./document_chunks") / f"{document_id}_chunks.json"
+                    status = "ready" if chunks_file.exists() else "processing"
                     
                 # Add document metadata
                 documents.append({
@@ -244,6 +268,9 @@ async def delete_document(
         chunks_file = chunks_dir / f"{document_id}_chunks.json"
         if chunks_file.exists():
             chunks_file.unlink()
+        (chunks_dir / f"{document_id}_embeddings.npy").unlink(missing_ok=True)
+        
+        await document_status.delete_document_status(document_id)
             
         return {"message": "Document deleted successfully"}
         
@@ -320,11 +347,12 @@ async def get_document_content(
 
 
 # Background processing function
-async def process_document_background(file_path: str, file_type: str, document_id: str, user_id: str, metadata: Dict[str, Any]):
+async def process_document_background(file_path: str, file_type: str, document_id: str, user_id: str, metadata: Dict[str, Any], content_hash: Optional[str] = None):
     """
     Process document in the background.
     """
     try:
+        await document_status.update_document_status(document_id, user_id, "processing")
         await openai_service.process_document(
             file_path=file_path,
             file_type=file_type,
@@ -332,7 +360,11 @@ async def process_document_background(file_path: str, file_type: str, document_i
             user_id=user_id,
             metadata=metadata
         )
+        await document_status.update_document_status(document_id, user_id, "ready")
+        if content_hash:
+            await document_status.record_content_hash(user_id, content_hash, document_id)
     except Exception as e:
         # Log error but don't raise (background task)
         import logging
         logging.error(f"Background processing failed for document {document_id}: {str(e)}")
+        await document_status.update_document_status(document_id, user_id, "failed")
@@ -53,22 +53,18 @@ async def delete_document(
         if chunks_file.exists():
             try:
                 chunks_file.unlink()
+                (chunks_dir / f"{document_id}_embeddings.npy").unlink(missing_ok=True)
                 logger.info(f"Deleted chunks file for document {document_id}")
             except Exception as e:
                 logger.error(f"Error deleting chunks file: {str(e)}")
                 # Don't fail the request if only the chunks deletion fails
         
-        # Delete any other associated files
-        # For example, status files
-        status_dir = Path("./document_status")
-        if status_dir.exists():
-            status_file = status_dir / f"{document_id}_status.json"
-            if status_file.exists():
-                try:
-                    status_file.unlink()
-                    logger.info(f"Deleted status file for document {document_id}")
-                except Exception as e:
-                    logger.error(f"Error deleting status file: {str(e)}")
+        # Delete the recorded processing status
+        try:
+            await document_status.delete_document_status(document_id)
+            logger.info(f"Deleted status for document {document_id}")
+        except Exception as e:
+            logger.error(f"Error deleting document status: {str(e)}")
         
         return {"message": "Document deleted successfully", "document_id": document_id}
         
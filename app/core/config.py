@@ -18,6 +18,9 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
     ALGORITHM: str = "HS256"
+    # Base64 (urlsafe) 32-byte key for OAuth token encryption; derived from SECRET_KEY when unset,
+    # in which case rotating SECRET_KEY makes stored OAuth tokens unreadable
+    OAUTH_TOKEN_ENCRYPTION_KEY: Optional[str] = None
     
     # Database
     DATABASE_URL: str = "sqlite:///./doztra_auth.db"
@@ -91,6 +94,7 @@ class Settings(BaseSettings):
     # Document Processing Settings
     UPLOAD_DIR: str = "./uploads"
     DOCUMENT_CHUNKS_DIR: str = "./document_chunks"
+    DOCUMENT_STATUS_DB: str = "./document_status/status.db"
     MAX_CONCURRENT_PROCESSING: int = 3
     DEFAULT_CHUNK_SIZE: int = 1000
     EMBEDDING_MODEL: str = "text-embedding-ada-002"
@@ -109,7 +113,7 @@ class Settings(BaseSettings):
     
     # Document Processing Optimization
     PARALLEL_EMBEDDING_GENERATION: bool = True
-    MAX_PARALLEL_EMBEDDINGS: int = 5
+    MAX_PARALLEL_EMBEDDINGS: int = 8
     OPTIMIZE_CHUNK_SIZE: bool = True
 
     # Klaviyo
@@ -1,10 +1,11 @@
 import logging
 import os
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, text
 
 from app.db.base import Base
-from app.db.session import engine, get_db
 from app.models.user import User, Subscription, SubscriptionPlan, SubscriptionStatus
 from app.services.auth import get_password_hash
 
@@ -12,57 +13,72 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def init_db(db: Session) -> None:
-    """Initialize database with tables and seed data."""
-    # Drop all tables and recreate them
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash seed passwords in parallel; bcrypt releases the GIL while hashing."""
+    with ThreadPoolExecutor(max_workers=len(passwords)) as executor:
+        return list(executor.map(get_password_hash, passwords))
+
+
+def _reset_and_seed(db: Session, seeds: List[Tuple[Dict[str, Any], str, SubscriptionPlan]]) -> None:
+    """
+    Drop and recreate all tables and insert the seed users in a single transaction.
     
-    logger.info("Database tables recreated")
+    Args:
+        db: Database session
+        seeds: (user fields, plain-text password, subscription plan) per user
+    """
+    # DDL and seed rows go through the session's connection, so the whole
+    # reset is committed (and fsynced) once; Postgres DDL is transactional
+    conn = db.connection()
+    if conn.dialect.name == "postgresql":
+        # A lost commit only means re-running setup, so don't wait for the WAL flush
+        conn.execute(text("SET LOCAL synchronous_commit = off"))
     
-    logger.info("Creating initial admin user")
+    Base.metadata.drop_all(bind=conn)
+    Base.metadata.create_all(bind=conn)
+    _seed_users(db, seeds)
     
-    # Create admin user
-    admin_user = User(
-        email="admin@doztra.ai",
-        name="Admin User",
-        hashed_password=get_password_hash("AdminPassword123!"),
-        is_active=True,
-        is_verified=True
-    )
-    db.add(admin_user)
-    db.flush()
+    db.commit()
+
+
+def _seed_users(db: Session, seeds: List[Tuple[Dict[str, Any], str, SubscriptionPlan]]) -> None:
+    """
+    Create seed users with an active subscription each.
     
-    # Create subscription for admin
-    admin_subscription = Subscription(
-        user_id=admin_user.id,
-        plan=SubscriptionPlan.PROFESSIONAL,
-        status=SubscriptionStatus.ACTIVE,
-        auto_renew=True
-    )
-    db.add(admin_subscription)
+    Args:
+        db: Database session
+        seeds: (user fields, plain-text password, subscription plan) per user
+    """
+    hashes = _hash_passwords([password for _, password, _ in seeds])
     
-    # Create test user
-    test_user = User(
-        email="test@doztra.ai",
-        name="Test User",
-        hashed_password=get_password_hash("TestPassword123!"),
-        is_active=True,
-        is_verified=True
-    )
-    db.add(test_user)
+    # One flush assigns all user primary keys before the subscriptions reference them
+    users = [
+        User(**fields, hashed_password=hashed_password, is_active=True, is_verified=True)
+        for (fields, _, _), hashed_password in zip(seeds, hashes)
+    ]
+    db.add_all(users)
     db.flush()
     
-    # Create subscription for test user
-    test_subscription = Subscription(
-        user_id=test_user.id,
-        plan=SubscriptionPlan.BASIC,
-        status=SubscriptionStatus.ACTIVE,
-        auto_renew=True
-    )
-    db.add(test_subscription)
+    db.add_all([
+        Subscription(
+            user_id=user.id,
+            plan=plan,
+            status=SubscriptionStatus.ACTIVE,
+            auto_renew=True
+        )
+        for user, (_, _, plan) in zip(users, seeds)
+    ])
+
+
+def init_db(db: Session) -> None:
+    """Initialize database with tables and seed data."""
+    logger.info("Recreating database tables and creating initial admin and test users")
+    
+    _reset_and_seed(db, [
+        ({"email": "admin@doztra.ai", "name": "Admin User"}, "AdminPassword123!", SubscriptionPlan.PROFESSIONAL),
+        ({"email": "test@doztra.ai", "name": "Test User"}, "TestPassword123!", SubscriptionPlan.BASIC),
+    ])
     
-    db.commit()
     logger.info("Initial data seeded successfully")
 
 
@@ -72,62 +88,20 @@ def init_test_db() -> None:
     test_db_url = os.environ.get("TEST_DATABASE_URL", "sqlite:///./test.db")
     test_engine = create_engine(test_db_url)
     
-    # Drop all tables and recreate them in the test database
-    Base.metadata.drop_all(bind=test_engine)
-    Base.metadata.create_all(bind=test_engine)
-    
-    logger.info("Test database tables recreated")
-    
     # Create a session for the test database
-    from sqlalchemy.orm import sessionmaker
     TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
     db = TestSessionLocal()
     
     try:
-        # Create test user with known ID for tests
-        test_user = User(
-            id="test-user-id",
-            email="test@example.com",
-            name="Test User",
-            hashed_password=get_password_hash("testpassword"),
-            is_active=True,
-            is_verified=True
-        )
-        db.add(test_user)
-        
-        # Create subscription for test user
-        test_subscription = Subscription(
-            user_id=test_user.id,
-            plan=SubscriptionPlan.PROFESSIONAL,
-            status=SubscriptionStatus.ACTIVE,
-            auto_renew=True
-        )
-        db.add(test_subscription)
-        
-        # Create admin user with known ID for tests
-        admin_user = User(
-            id="admin-user-id",
-            email="admin@example.com",
-            name="Admin User",
-            hashed_password=get_password_hash("adminpassword"),
-            is_active=True,
-            is_verified=True,
-            role="ADMIN"  # Set admin role
-        )
-        db.add(admin_user)
-        
-        # Create subscription for admin user
-        admin_subscription = Subscription(
-            user_id=admin_user.id,
-            plan=SubscriptionPlan.PROFESSIONAL,
-            status=SubscriptionStatus.ACTIVE,
-            auto_renew=True
-        )
-        db.add(admin_subscription)
+        # Recreate all tables and add test and admin users with known IDs for tests
+        _reset_and_seed(db, [
+            ({"id": "test-user-id", "email": "test@example.com", "name": "Test User"}, "testpassword", SubscriptionPlan.PROFESSIONAL),
+            ({"id": "admin-user-id", "email": "admin@example.com", "name": "Admin User", "role": "ADMIN"}, "adminpassword", SubscriptionPlan.PROFESSIONAL),
+        ])
         
         # Add any other test data needed for research options tests
         
-        db.commit()
         logger.info("Test data seeded successfully")
     finally:
         db.close()
+        test_engine.dispose()
@@ -1,5 +1,7 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import logging
@@ -25,10 +27,45 @@ if "://" in database_url and "@" in database_url:
 
 logger.info(f"Connecting to database: {masked_url}")
 
+# Render's Postgres can be cold or drop idle connections: check connections
+# before use, recycle them before the server-side idle timeout, and enable TCP
+# keepalives so a dead peer is noticed instead of hanging a request
+engine_options = {"pool_pre_ping": True, "pool_recycle": 300}
+if database_url.startswith("postgres"):
+    engine_options["connect_args"] = {
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "connect_timeout": 10,
+    }
+
 # Create engine and session
-engine = create_engine(database_url)
+engine = create_engine(database_url, **engine_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def wait_for_database(attempts: int = 3, base_delay: float = 0.5) -> None:
+    """
+    Block until the database accepts connections, retrying with exponential backoff
+
+    Args:
+        attempts: Number of connection attempts before giving up
+        base_delay: Delay in seconds after the first failure, doubled after each retry
+
+    Raises:
+        OperationalError: If the database is still unreachable after the last attempt
+    """
+    for attempt in range(attempts):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except OperationalError as e:
+            if attempt == attempts - 1:
+                raise
+            delay = base_delay * 2 ** attempt
+            logger.warning(f"Database not reachable ({e.orig}), retrying in {delay}s")
+            time.sleep(delay)
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,27 @@
+from typing import Any, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.utils.security import encrypt_oauth_token, decrypt_oauth_token
+
+
+class EncryptedToken(TypeDecorator):
+    """
+    String column stored as an encrypted BYTEA blob.
+    
+    Values are encrypted with ChaCha20-Poly1305 on bind and decrypted on load,
+    so application code keeps reading and writing plain strings.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        return encrypt_oauth_token(value)
+
+    def process_result_value(self, value: Optional[bytes], dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return decrypt_oauth_token(bytes(value))
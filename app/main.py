@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from datetime import datetime
+from functools import lru_cache
 import json
 import logging
 import os
@@ -20,6 +21,8 @@ from app.api.routes import auth, users, token_usage, user_preferences, usage_sta
 from app.core.config import settings
 from app.services.auth import get_current_user, verify_token
 from app.services.admin import verify_admin_token, security
+from app.services.openai_service import warm_up_client, close_client, close_embedding_batcher, shutdown_extraction_pool
+from app.utils.security import validate_oauth_token_key
 from app.db.session import get_db
 
 # Configure logging
@@ -419,13 +422,9 @@ def generate_swagger_ui_html(token=None):
     return HTMLResponse(content=modified_content)
 
 # Public helper page to view docs by injecting X-Admin-Docs-Key
-@app.get("/admin-docs", include_in_schema=False)
-async def admin_docs_page():
-    """
-    Public HTML that renders Swagger UI and injects the header X-Admin-Docs-Key
-    from sessionStorage or the `?key=` query parameter, so it can call the
-    protected /api/openapi.json endpoint.
-    """
+@lru_cache(maxsize=1)
+def _admin_docs_html() -> str:
+    """Build the admin docs page once; it does not depend on the request."""
     ui = get_swagger_ui_html(
         openapi_url="/api/openapi.json",
         title=f"{app.title} - Admin Docs",
@@ -466,7 +465,16 @@ async def admin_docs_page():
     })();
     </script>
     """
-    return HTMLResponse(content=html.replace("</body>", inject + "</body>"))
+    return html.replace("</body>", inject + "</body>")
+
+@app.get("/admin-docs", include_in_schema=False)
+async def admin_docs_page():
+    """
+    Public HTML that renders Swagger UI and injects the header X-Admin-Docs-Key
+    from sessionStorage or the `?key=` query parameter, so it can call the
+    protected /api/openapi.json endpoint.
+    """
+    return HTMLResponse(content=_admin_docs_html())
 
 # API landing page (public)
 @app.get("/", include_in_schema=False)
@@ -517,6 +525,31 @@ async def admin_dashboard_page(request: Request):
     """
     return templates.TemplateResponse("admin-dashboard.html", {"request": request})
 
+@app.on_event("startup")
+async def check_oauth_token_key():
+    """Refuse to start with an OAuth token encryption key ChaCha20-Poly1305 cannot use."""
+    validate_oauth_token_key()
+
+@app.on_event("startup")
+async def warm_up_openai_client():
+    """Prime the OpenAI connection pool so the first document does not pay the TLS handshake."""
+    await warm_up_client()
+
+@app.on_event("shutdown")
+async def stop_embedding_batcher():
+    """Stop the embedding batcher before the OpenAI client it calls is closed."""
+    await close_embedding_batcher()
+
+@app.on_event("shutdown")
+async def close_openai_client():
+    """Close pooled OpenAI connections."""
+    await close_client()
+
+@app.on_event("shutdown")
+async def stop_extraction_workers():
+    """Stop the text extraction worker processes."""
+    shutdown_extraction_pool()
+
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check(request: Request):
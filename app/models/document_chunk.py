@@ -11,7 +11,7 @@ from uuid import uuid4
 class DocumentChunk(Base):
     __tablename__ = "document_chunks"
     
-    id = Column(String, primary_key=True, index=True, default=lambda: f"chunk-{uuid4()}")
+    id = Column(String, primary_key=True, default=lambda: f"chunk-{uuid4()}")
     document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
     text = Column(Text, nullable=False)
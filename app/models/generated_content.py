@@ -13,13 +13,13 @@ class GeneratedContent(Base):
     """Model for storing generated research content."""
     __tablename__ = "generated_content"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("research_projects.id", ondelete="CASCADE"), nullable=False)
     section_title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     version = Column(Integer, default=1, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     content_metadata = Column(JSON, nullable=True)  # Store additional metadata about the generation
     
     # Relationships
@@ -8,7 +8,7 @@ from app.db.base_class import Base
 class JobApplication(Base):
     __tablename__ = "job_applications"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     email = Column(String, nullable=False, index=True)
     role = Column(String, nullable=False, index=True)
@@ -18,5 +18,5 @@ class JobApplication(Base):
     cover_letter = Column(Text, nullable=True)
     status = Column(String, nullable=False, default="submitted")
     extra_data = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -15,7 +16,7 @@ class RequestType(str, enum.Enum):
 class TokenUsage(Base):
     __tablename__ = "token_usage"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     request_type = Column(Enum(RequestType), nullable=False)
     model = Column(String, nullable=False)
@@ -24,7 +25,7 @@ class TokenUsage(Base):
     total_tokens = Column(Integer, default=0, nullable=False)
     request_id = Column(String, nullable=True)
     conversation_id = Column(String, nullable=True)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime(timezone=True), default=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="token_usage")
@@ -33,7 +34,7 @@ class TokenUsage(Base):
 class TokenUsageSummary(Base):
     __tablename__ = "token_usage_summary"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     year = Column(Integer, nullable=False)
     month = Column(Integer, nullable=False)
@@ -44,8 +45,8 @@ class TokenUsageSummary(Base):
     plagiarism_tokens = Column(Integer, default=0, nullable=False)
     prompt_generation_tokens = Column(Integer, default=0, nullable=False)
     total_tokens = Column(Integer, default=0, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="token_usage_summary")
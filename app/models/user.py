@@ -3,6 +3,7 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from app.db.base_class import Base
+from app.db.types import EncryptedToken
 import uuid
 
 
@@ -13,6 +14,7 @@ class SubscriptionPlan(str, enum.Enum):
 
 
 class ModelTier(str, enum.Enum):
+    # Stored as varchar; keep in sync with the ck_model_tier check constraint
     GPT_3_5_TURBO = "gpt-3.5-turbo"
     GPT_4 = "gpt-4"
     GPT_4_TURBO = "gpt-4-turbo"
@@ -47,8 +49,8 @@ class User(Base):
     # OAuth fields
     oauth_provider = Column(String, nullable=True)  # e.g., 'google', 'facebook'
     oauth_user_id = Column(String, nullable=True)  # Provider's user ID
-    oauth_access_token = Column(String, nullable=True)
-    oauth_refresh_token = Column(String, nullable=True)
+    oauth_access_token = Column(EncryptedToken, nullable=True)  # Encrypted at rest (BYTEA)
+    oauth_refresh_token = Column(EncryptedToken, nullable=True)  # Encrypted at rest (BYTEA)
     oauth_token_expires_at = Column(DateTime, nullable=True)
     
     # Relationships (restored to original working state)
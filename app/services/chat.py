@@ -13,6 +13,7 @@ from app.models.user import User
 from app.services.token_usage import record_token_usage
 from app.services.ai import get_ai_response, moderate_content
 from app.services.usage import before_llm_check, after_llm_update
+from app.utils.uuid_helper import is_valid_uuid
 
 
 def create_conversation(
@@ -154,6 +155,11 @@ def get_conversation(
     Returns:
         Conversation object if found, None otherwise
     """
+    # Conversation ids are native UUIDs; a malformed id can never match and
+    # would otherwise fail the query with a DataError
+    if not is_valid_uuid(conversation_id):
+        return None
+    
     try:
         # Use a more explicit query to avoid issues with missing columns
         from sqlalchemy import select
@@ -4,6 +4,7 @@ Document service for handling document operations.
 import json
 import asyncio
 from typing import List, Dict, Any, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, BackgroundTasks
 from datetime import datetime
@@ -210,30 +211,25 @@ class DocumentService:
                                 text = f"[Error reading file: {str(e)}]"
                     
                     # Create a single chunk
-                    chunks = [
-                        {
-                            "id": f"{document_id}_chunk_0",
-                            "text": text,
-                            "metadata": {
-                                "document_id": document_id,
-                                "user_id": user_id,
-                                "chunk_index": 0,
-                                "file_type": file_type,
-                                "processed_at": datetime.utcnow().isoformat(),
-                                **(metadata or {})
-                            },
-                            # Simple mock embedding (just zeros)
-                            "embedding": [0.0] * 10
-                        }
-                    ]
+                    texts = [text]
+                    metadatas = [{
+                        "document_id": document_id,
+                        "user_id": user_id,
+                        "chunk_index": 0,
+                        "file_type": file_type,
+                        "processed_at": datetime.utcnow().isoformat(),
+                        **(metadata or {})
+                    }]
+                    # Simple mock embedding (just zeros)
+                    embeddings = [[0.0] * 10]
                     
                     # Save chunks to database
-                    await self._save_chunks_to_db(db, document_id, chunks)
+                    await self._save_chunks_to_db(db, document_id, texts, metadatas, embeddings)
                     
                     # Update document status to completed
                     document.processing_status = "completed"
                     document.document_metadata["processing_completed_at"] = datetime.utcnow().isoformat()
-                    document.document_metadata["chunk_count"] = len(chunks)
+                    document.document_metadata["chunk_count"] = len(texts)
                     db.commit()
                     
                 except Exception as e:
@@ -284,29 +280,38 @@ class DocumentService:
         self,
         db: Session,
         document_id: str,
-        chunks: List[Dict[str, Any]]
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
     ) -> None:
         """
-        Save document chunks to database.
+        Save document chunks to database in a single bulk INSERT.
         
         Args:
             db: Database session
             document_id: Document ID
-            chunks: List of document chunks
+            texts: Text of each chunk
+            metadatas: Metadata of each chunk, parallel to texts
+            embeddings: Embedding of each chunk, parallel to texts
         """
         # Delete existing chunks if any
         db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).delete()
         
         # Add new chunks
-        for i, chunk in enumerate(chunks):
-            db_chunk = DocumentChunk(
-                document_id=document_id,
-                chunk_index=i,
-                text=chunk["text"],
-                embedding=chunk.get("embedding"),
-                chunk_metadata=chunk.get("metadata", {})
+        if texts:
+            db.execute(
+                insert(DocumentChunk),
+                [
+                    {
+                        "document_id": document_id,
+                        "chunk_index": i,
+                        "text": text,
+                        "embedding": [float(value) for value in embedding],
+                        "chunk_metadata": metadata or {}
+                    }
+                    for i, (text, metadata, embedding) in enumerate(zip(texts, metadatas, embeddings))
+                ]
             )
-            db.add(db_chunk)
         
         db.commit()
     
@@ -0,0 +1,178 @@
+"""
+Processing status and content fingerprint store for uploaded documents.
+
+Statuses live in a single SQLite database in WAL mode instead of one file per
+document, so a status transition is one UPDATE on an already-open connection
+and listing a user's documents is one indexed query. The same database maps
+content hashes to processed documents so identical uploads can reuse chunks.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Open the status database on first use and reuse the connection afterwards."""
+    global _connection
+    if _connection is None:
+        db_path = Path(settings.DOCUMENT_STATUS_DB)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS doc_status (
+                document_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_doc_status_user_id ON doc_status (user_id)")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS content_hash (
+                user_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                document_id TEXT NOT NULL,
+                PRIMARY KEY (user_id, content_hash)
+            )
+        """)
+        connection.commit()
+        _connection = connection
+    return _connection
+
+
+def _update_status(document_id: str, user_id: str, status: str) -> None:
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO doc_status (document_id, user_id, status, updated_at) VALUES (?, ?, ?, ?)",
+            (document_id, user_id, status, datetime.utcnow().isoformat())
+        )
+        connection.commit()
+
+
+def _get_status(document_id: str) -> Optional[str]:
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT status FROM doc_status WHERE document_id = ?", (document_id,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _get_user_statuses(user_id: str) -> Dict[str, str]:
+    with _lock:
+        rows = _get_connection().execute(
+            "SELECT document_id, status FROM doc_status WHERE user_id = ?", (user_id,)
+        ).fetchall()
+    return dict(rows)
+
+
+def _delete_status(document_id: str) -> None:
+    with _lock:
+        connection = _get_connection()
+        connection.execute("DELETE FROM doc_status WHERE document_id = ?", (document_id,))
+        connection.execute("DELETE FROM content_hash WHERE document_id = ?", (document_id,))
+        connection.commit()
+
+
+def _record_hash(user_id: str, content_hash: str, document_id: str) -> None:
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO content_hash (user_id, content_hash, document_id) VALUES (?, ?, ?)",
+            (user_id, content_hash, document_id)
+        )
+        connection.commit()
+
+
+def _find_by_hash(user_id: str, content_hash: str) -> Optional[str]:
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT document_id FROM content_hash WHERE user_id = ? AND content_hash = ?",
+            (user_id, content_hash)
+        ).fetchone()
+    return row[0] if row else None
+
+
+async def update_document_status(document_id: str, user_id: str, status: str) -> None:
+    """
+    Record the processing status of a document.
+
+    Args:
+        document_id: Document ID
+        user_id: ID of the user who owns the document
+        status: New status (e.g. uploaded, processing, ready, failed)
+    """
+    await run_in_threadpool(_update_status, document_id, user_id, status)
+
+
+async def get_document_status(document_id: str) -> Optional[str]:
+    """
+    Get the recorded processing status of a document.
+
+    Args:
+        document_id: Document ID
+
+    Returns:
+        Optional[str]: The status, or None if nothing was recorded
+    """
+    return await run_in_threadpool(_get_status, document_id)
+
+
+async def get_user_document_statuses(user_id: str) -> Dict[str, str]:
+    """
+    Get the recorded processing statuses of all documents of a user.
+
+    Args:
+        user_id: ID of the user
+
+    Returns:
+        Dict[str, str]: Mapping of document ID to status
+    """
+    return await run_in_threadpool(_get_user_statuses, user_id)
+
+
+async def delete_document_status(document_id: str) -> None:
+    """
+    Remove the recorded status of a deleted document.
+
+    Args:
+        document_id: Document ID
+    """
+    await run_in_threadpool(_delete_status, document_id)
+
+
+async def record_content_hash(user_id: str, content_hash: str, document_id: str) -> None:
+    """
+    Remember which processed document holds the given file content.
+
+    Args:
+        user_id: ID of the user who owns the document
+        content_hash: Hex digest of the uploaded file
+        document_id: ID of the processed document
+    """
+    await run_in_threadpool(_record_hash, user_id, content_hash, document_id)
+
+
+async def find_document_by_content_hash(user_id: str, content_hash: str) -> Optional[str]:
+    """
+    Find a processed document of the user with identical file content.
+
+    Args:
+        user_id: ID of the user
+        content_hash: Hex digest of the uploaded file
+
+    Returns:
+        Optional[str]: ID of the matching document, or None
+    """
+    return await run_in_threadpool(_find_by_hash, user_id, content_hash)
@@ -3,11 +3,11 @@ Google Cloud Storage service for handling file uploads and downloads.
 """
 import os
 import shutil
-import aiofiles
 from pathlib import Path
 from fastapi import UploadFile
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.utils.uploads import save_upload_file
 
 # Try to import Google Cloud Storage client
 try:
@@ -85,14 +85,8 @@ class GCSStorageService:
                 # Save file path
                 file_path = doc_dir / file_name
                 
-                # Save file using async I/O
-                async with aiofiles.open(file_path, "wb") as buffer:
-                    # Read file content into memory first to avoid blocking I/O
-                    content = await file.read()
-                    await buffer.write(content)
-                
-                # Get file size
-                file_size = os.path.getsize(file_path)
+                # Stream file to disk in fixed-size chunks
+                file_size = await save_upload_file(file, file_path)
                 
                 # Return file metadata
                 return {
@@ -1,37 +1,94 @@
 """
 Service for interacting with OpenAI API, document processing, and LLM interactions.
 """
-from openai import AsyncOpenAI
-from typing import Optional, List, Dict, Any, Tuple, Union
+from openai import AsyncOpenAI, BadRequestError, DefaultAsyncHttpxClient
+from typing import Optional, List, Dict, Any, Set, Tuple, Union
 import logging
 import os
 import json
 import base64
+import io
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import tempfile
 import uuid
 import httpx
+import numpy as np
 from pathlib import Path
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.utils.text_extraction import extract_text_sync
+from app.utils.uploads import drop_from_page_cache
 
-# Configure OpenAI API client
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Configure OpenAI API client with a connection pool large enough for the
+# concurrent embedding requests, so warm connections are reused across documents
+client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    )
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+WARM_UP_TIMEOUT = 5  # Seconds startup waits for the OpenAI warm-up request
+
 
 def get_openai_client():
     """Returns the configured OpenAI client instance"""
     return client
 
+
+async def warm_up_client() -> None:
+    """
+    Open a connection to the OpenAI API ahead of the first real request.
+    
+    Listing models is free and goes to the same host as embeddings, so the
+    TLS handshake is paid at startup instead of on the first document. The
+    call is bounded by WARM_UP_TIMEOUT and not retried, so a slow or
+    unreachable API cannot hold up server startup.
+    """
+    if not settings.OPENAI_API_KEY:
+        return
+    try:
+        await asyncio.wait_for(
+            client.with_options(max_retries=0, timeout=WARM_UP_TIMEOUT).models.list(),
+            timeout=WARM_UP_TIMEOUT
+        )
+    except Exception as e:
+        logger.warning(f"OpenAI client warm-up failed: {str(e) or type(e).__name__}")
+
+
+async def close_client() -> None:
+    """Close the pooled connections of the OpenAI client."""
+    await client.close()
+
 # Constants
-MAX_CHUNK_SIZE = 8000  # Maximum tokens per chunk for context window
+MAX_CHUNK_SIZE = 8000  # Maximum characters per chunk for context window
+MAX_CHUNK_TOKENS = 2000  # Token budget per chunk (~MAX_CHUNK_SIZE characters of English)
 OVERLAP_SIZE = 200     # Overlap between chunks to maintain context
 EMBEDDING_MODEL = "text-embedding-ada-002"  # OpenAI embedding model
 EMBEDDING_DIMENSION = 1536  # Dimension of OpenAI embeddings
+EMBEDDING_BATCH_MAX_TOKENS = 8192  # Token budget per embeddings request
+EMBEDDING_BATCH_MAX_INPUTS = 2048  # Maximum inputs per embeddings request
+EMBEDDING_STORAGE_DTYPE = np.float16  # Stored embedding precision
+EXTRACTION_WORKERS = min(8, os.cpu_count() or 1)  # Text extraction processes
+LARGE_DOCUMENT_TOKENS = 32000  # Documents above this many tokens use half the chunk budget
+MIN_CHUNK_SIZE = 500  # Smallest chunk size (characters) tried after embedding failures
+EMBEDDING_BATCH_MAX_WAIT = 0.2  # Seconds to wait for other documents before flushing a batch
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
 
 
 async def generate_research_content(
@@ -394,10 +451,32 @@ async def generate_chat_response(messages: List[Dict[str, Any]]) -> str:
         raise Exception(f"Failed to generate response: {str(e)}")
 
 
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """Create the text extraction process pool on first use."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Stop the text extraction worker processes, if any were started."""
+    global _extraction_pool
+    pool, _extraction_pool = _extraction_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 async def extract_text_from_document(file_path: str, file_type: str) -> str:
     """
     Extract text content from a document file.
     
+    Parsing is CPU-bound, so it runs in a process pool where it neither holds
+    the GIL of the server process nor blocks the event loop.
+    
     Args:
         file_path: Path to the document file
         file_type: MIME type of the file
@@ -406,52 +485,20 @@ async def extract_text_from_document(file_path: str, file_type: str) -> str:
         str: Extracted text content
     """
     try:
-        # Check if file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-            
-        # Extract text based on file type
-        if file_type == "application/pdf":
-            # Use PyPDF for PDF extraction
-            import PyPDF2
-            
-            with open(file_path, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                # Extract text from each page
-                for page_num in range(len(reader.pages)):
-                    page = reader.pages[page_num]
-                    text += page.extract_text() + "\n\n"
-                    
-                return text
-                
-        elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            # Use python-docx for DOCX extraction
-            import docx
-            
-            doc = docx.Document(file_path)
-            text = "\n\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text
-            
-        elif file_type == "text/plain":
-            # Simple text file
-            with open(file_path, "r", encoding="utf-8") as file:
-                return file.read()
-                
-        elif file_type == "text/csv":
-            # Use pandas for CSV
-            import pandas as pd
-            
-            df = pd.read_csv(file_path)
-            return df.to_string()
-            
-        elif file_type in ["image/jpeg", "image/png", "image/gif", "image/webp"]:
+        if file_type in ["image/jpeg", "image/png", "image/gif", "image/webp"]:
             # Use OpenAI's vision capabilities for images
             return await extract_text_from_image(file_path)
-            
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+        
+        loop = asyncio.get_running_loop()
+        pool = _get_extraction_pool()
+        try:
+            return await loop.run_in_executor(pool, extract_text_sync, file_path, file_type)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory on a huge PDF) and the pool is
+            # unusable from now on; drop it so the next document gets a fresh one
+            if _extraction_pool is pool:
+                shutdown_extraction_pool()
+            raise
             
     except Exception as e:
         logger.error(f"Error extracting text from document: {str(e)}")
@@ -498,7 +545,64 @@ async def extract_text_from_image(image_path: str) -> str:
         raise Exception(f"Failed to process image: {str(e)}")
 
 
-async def chunk_document(text: str, metadata: Dict[str, Any] = None, chunk_size: int = None) -> List[Dict[str, Any]]:
+def _split_paragraph(paragraph: str, max_size: int) -> List[str]:
+    """
+    Split a paragraph longer than max_size into pieces of at most max_size.
+    
+    Cuts at the last line break that fits, then at the last space, and only
+    cuts inside a word when neither exists.
+    """
+    pieces = []
+    while len(paragraph) > max_size:
+        cut = paragraph.rfind("\n", 0, max_size + 1)
+        if cut <= 0:
+            cut = paragraph.rfind(" ", 0, max_size + 1)
+        if cut <= 0:
+            pieces.append(paragraph[:max_size])
+            paragraph = paragraph[max_size:]
+        else:
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut + 1:]
+    if paragraph or not pieces:
+        pieces.append(paragraph)
+    return pieces
+
+
+def _chunk_boundaries(lengths: List[int], max_size: int) -> List[Tuple[int, int]]:
+    """
+    Group consecutive paragraphs into chunks using only their lengths.
+    
+    A paragraph that does not fit in the current chunk starts a new one.
+    Paragraphs in a chunk are joined with a blank line. Paragraphs must be no
+    longer than max_size (see _split_paragraph).
+    
+    Args:
+        lengths: Length of each paragraph
+        max_size: Maximum chunk size in characters
+        
+    Returns:
+        List[Tuple[int, int]]: (start, end) paragraph ranges of each chunk
+    """
+    boundaries = []
+    start = 0
+    current_length = 0
+    for i, length in enumerate(lengths):
+        if current_length + length > max_size:
+            if current_length:  # Don't add empty chunks
+                boundaries.append((start, i))
+            start, current_length = i, length
+        elif current_length:
+            current_length += 2 + length
+        else:
+            start, current_length = i, length
+    
+    # Add the last chunk if it's not empty
+    if current_length:
+        boundaries.append((start, len(lengths)))
+    return boundaries
+
+
+async def chunk_document(text: str, metadata: Dict[str, Any] = None, chunk_size: int = None) -> Tuple[List[str], List[Dict[str, Any]]]:
     """
     Split a document into manageable chunks for processing.
     
@@ -508,92 +612,396 @@ async def chunk_document(text: str, metadata: Dict[str, Any] = None, chunk_size:
         chunk_size: Optional custom chunk size (defaults to MAX_CHUNK_SIZE)
         
     Returns:
-        List[Dict[str, Any]]: List of chunks with text and metadata
+        Tuple[List[str], List[Dict[str, Any]]]: Chunk texts and the metadata of
+        each chunk, as parallel lists
     """
     try:
-        # Simple chunking by paragraphs and size
-        paragraphs = text.split("\n\n")
-        chunks = []
-        current_chunk = ""
-        
         # Use custom chunk size if provided, otherwise use default
         max_size = chunk_size if chunk_size is not None else MAX_CHUNK_SIZE
         
-        for i, paragraph in enumerate(paragraphs):
-            # If adding this paragraph would exceed max chunk size, save current chunk and start a new one
-            if len(current_chunk) + len(paragraph) > max_size:
-                if current_chunk:  # Don't add empty chunks
-                    chunks.append({
-                        "text": current_chunk,
-                        "metadata": {
-                            "chunk_index": len(chunks),
-                            **(metadata or {})
-                        }
-                    })
-                current_chunk = paragraph
-            else:
-                # Add paragraph to current chunk
-                if current_chunk:
-                    current_chunk += "\n\n" + paragraph
-                else:
-                    current_chunk = paragraph
-        
-        # Add the last chunk if it's not empty
-        if current_chunk:
-            chunks.append({
-                "text": current_chunk,
-                "metadata": {
-                    "chunk_index": len(chunks),
-                    **(metadata or {})
-                }
-            })
-            
-        return chunks
+        # Simple chunking by paragraphs and size; a paragraph that alone exceeds
+        # the chunk size (e.g. a text file without blank lines) is split first
+        paragraphs = [
+            piece
+            for paragraph in text.split("\n\n")
+            for piece in (_split_paragraph(paragraph, max_size) if len(paragraph) > max_size else (paragraph,))
+        ]
+        
+        # Find chunk boundaries first, then build each chunk with a single join
+        # instead of growing a string paragraph by paragraph
+        boundaries = _chunk_boundaries([len(paragraph) for paragraph in paragraphs], max_size)
+        texts = ["\n\n".join(paragraphs[start:end]) for start, end in boundaries]
+        
+        metadatas = [{"chunk_index": i, **(metadata or {})} for i in range(len(texts))]
+        return texts, metadatas
         
     except Exception as e:
         logger.error(f"Error chunking document: {str(e)}")
         raise Exception(f"Failed to chunk document: {str(e)}")
 
 
-async def generate_embeddings(texts: List[str]) -> List[List[float]]:
+def _count_embedding_tokens(texts: List[str]) -> List[int]:
     """
-    Generate embeddings for a list of text chunks using OpenAI's embedding model.
+    Count the tokens of each text for the embedding model.
+    
+    Falls back to the ~4 characters per token heuristic when tiktoken is not installed.
+    """
+    if TIKTOKEN_AVAILABLE:
+        encoding = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+        return [len(tokens) for tokens in encoding.encode_batch(texts)]
+    return [max(1, len(text) // 4) for text in texts]
+
+
+def _pack_embedding_batches(token_counts: List[int]) -> List[Tuple[int, int]]:
+    """
+    Greedily pack consecutive texts into batches that respect the request limits.
     
     Args:
-        texts: List of text chunks to embed
+        token_counts: Token count of each text, in input order
         
     Returns:
-        List[List[float]]: List of embedding vectors
+        List[Tuple[int, int]]: (start, end) index ranges of each batch
+    """
+    batches = []
+    start = 0
+    batch_tokens = 0
+    for i, count in enumerate(token_counts):
+        if i > start and (
+            batch_tokens + count > EMBEDDING_BATCH_MAX_TOKENS
+            or i - start >= EMBEDDING_BATCH_MAX_INPUTS
+        ):
+            batches.append((start, i))
+            start = i
+            batch_tokens = 0
+        batch_tokens += count
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
+
+
+class EmbeddingInputsRejected(Exception):
+    """
+    Raised when the embeddings API rejects some inputs even when sent on their own.
+    
+    Carries the embeddings of the accepted inputs, so only the rejected ones
+    have to be re-chunked and embedded again.
+    
+    Attributes:
+        rejected: Indices of the rejected inputs
+        embeddings: Embedding matrix of all inputs; rows of rejected inputs are zero
+    """
+    
+    def __init__(self, rejected: List[int], embeddings: np.ndarray):
+        super().__init__(f"{len(rejected)} of {len(embeddings)} embedding inputs rejected")
+        self.rejected = rejected
+        self.embeddings = embeddings
+
+
+# Error codes and message fragments the embeddings API uses when an input or
+# a request carries too many tokens
+EMBEDDING_TOO_LARGE_CODES = {"context_length_exceeded", "max_tokens_per_request"}
+EMBEDDING_TOO_LARGE_MESSAGES = ("maximum context length", "too many tokens", "tokens per request")
+
+
+def _is_input_too_large(error: BadRequestError) -> bool:
+    """Tell whether a 400 from the embeddings API is a size rejection that splitting can fix."""
+    if getattr(error, "code", None) in EMBEDDING_TOO_LARGE_CODES:
+        return True
+    message = str(error).lower()
+    return any(fragment in message for fragment in EMBEDDING_TOO_LARGE_MESSAGES)
+
+
+async def _embed_batch(batch: List[str], semaphore: asyncio.Semaphore, rejected: Optional[List[int]] = None, offset: int = 0) -> List[List[float]]:
+    """
+    Embed one batch, splitting it in half and retrying if the API rejects it as too large.
+    
+    A single input that is still too large raises BadRequestError, or, when a
+    rejected list is given, is recorded there by its index (offset + position)
+    and gets a zero row. Any other 400 (unknown model, malformed input) is
+    raised immediately, since splitting cannot fix it.
     """
     try:
-        # Process in batches to avoid rate limits
-        embeddings = []
-        batch_size = 20  # Adjust based on API limits
-        
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
-            
-            # Call OpenAI API to generate embeddings
+        async with semaphore:
             response = await client.embeddings.create(
                 model=EMBEDDING_MODEL,
                 input=batch
             )
-            
-            # Extract embedding data
-            batch_embeddings = [data.embedding for data in response.data]
-            embeddings.extend(batch_embeddings)
-            
-            # Respect rate limits
-            if i + batch_size < len(texts):
-                await asyncio.sleep(0.5)
-                
+        return [data.embedding for data in response.data]
+    except BadRequestError as e:
+        if not _is_input_too_large(e):
+            raise
+        if len(batch) == 1:
+            if rejected is None:
+                raise
+            rejected.append(offset)
+            return [[0.0] * EMBEDDING_DIMENSION]
+        middle = len(batch) // 2
+        logger.warning(f"Embedding batch of {len(batch)} inputs rejected, retrying as two batches")
+        left, right = await asyncio.gather(
+            _embed_batch(batch[:middle], semaphore, rejected, offset),
+            _embed_batch(batch[middle:], semaphore, rejected, offset + middle)
+        )
+        return left + right
+
+
+async def generate_embeddings(texts: List[str], dtype: Any = np.float32, rejected: Optional[List[int]] = None) -> np.ndarray:
+    """
+    Generate embeddings for a list of text chunks using OpenAI's embedding model.
+    
+    Texts are packed into as few requests as the per-request token and input
+    limits allow. At most MAX_PARALLEL_EMBEDDINGS requests are in flight at a
+    time, which bounds the response buffers held in memory. Each batch is
+    copied into a preallocated matrix as soon as it arrives.
+    
+    Args:
+        texts: List of text chunks to embed
+        dtype: NumPy dtype of the returned matrix
+        rejected: Optional list that collects the indices of inputs the API
+            rejects even on their own, instead of failing the whole call;
+            their rows are left as zeros
+        
+    Returns:
+        np.ndarray: Embedding matrix with one row per text
+    """
+    try:
+        embeddings = np.empty((len(texts), EMBEDDING_DIMENSION), dtype=dtype)
+        if not texts:
+            return embeddings
+        
+        token_counts = _count_embedding_tokens(texts)
+        batches = _pack_embedding_batches(token_counts)
+        max_in_flight = settings.MAX_PARALLEL_EMBEDDINGS if settings.PARALLEL_EMBEDDING_GENERATION else 1
+        semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        
+        async def embed_into(start: int, end: int) -> None:
+            embeddings[start:end] = await _embed_batch(texts[start:end], semaphore, rejected, start)
+        
+        await asyncio.gather(*(embed_into(start, end) for start, end in batches))
         return embeddings
         
+    except BadRequestError:
+        # Surface rejected inputs as-is so callers can re-chunk and retry
+        raise
     except Exception as e:
         logger.error(f"Error generating embeddings: {str(e)}")
         raise Exception(f"Failed to generate embeddings: {str(e)}")
 
 
+class EmbeddingBatcher:
+    """
+    Coalesces embedding requests from documents processed at the same time.
+    
+    Each upload is processed in its own background task. Instead of every
+    document sending its own (often small) embedding requests, documents queue
+    their chunk texts here and a worker sends them to the API together once
+    the token budget is filled or EMBEDDING_BATCH_MAX_WAIT has passed. Each
+    flush runs as its own task, up to MAX_PARALLEL_EMBEDDINGS at a time, so a
+    large document does not hold back the uploads queued behind it. While all
+    flush slots are busy new requests keep queueing, so the next flush grows
+    with load.
+    """
+    
+    def __init__(self, dtype: Any = EMBEDDING_STORAGE_DTYPE, max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS, max_wait: float = EMBEDDING_BATCH_MAX_WAIT):
+        self.dtype = dtype
+        self.max_tokens = max_tokens
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flush_slots: Optional[asyncio.Semaphore] = None
+        self._flushes: Set[asyncio.Task] = set()
+    
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed the chunk texts of one document, batched with other documents.
+        
+        Args:
+            texts: Chunk texts to embed
+            
+        Returns:
+            np.ndarray: Embedding matrix with one row per text
+            
+        Raises:
+            EmbeddingInputsRejected: If the API rejected some of the texts
+        """
+        if not texts:
+            return np.empty((0, EMBEDDING_DIMENSION), dtype=self.dtype)
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            max_flushes = settings.MAX_PARALLEL_EMBEDDINGS if settings.PARALLEL_EMBEDDING_GENERATION else 1
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._flush_slots = asyncio.Semaphore(max(1, max_flushes))
+            self._flushes = set()
+            self._worker = loop.create_task(self._run())
+        
+        # Tokenizing is CPU-bound, so count off the event loop
+        token_count = sum(await run_in_threadpool(_count_embedding_tokens, texts))
+        future = loop.create_future()
+        await self._queue.put((texts, token_count, future))
+        return await future
+    
+    async def close(self) -> None:
+        """Stop the worker and in-flight flushes, cancelling every pending request."""
+        worker, self._worker = self._worker, None
+        if worker is None or self._loop is not asyncio.get_running_loop():
+            return
+        tasks = [worker, *self._flushes]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+    
+    async def _run(self) -> None:
+        while True:
+            requests = [await self._queue.get()]
+            try:
+                tokens = requests[0][1]
+                deadline = self._loop.time() + self.max_wait
+                while tokens < self.max_tokens:
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        request = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    requests.append(request)
+                    tokens += request[1]
+                await self._flush_slots.acquire()
+            except asyncio.CancelledError:
+                _cancel_pending(requests)
+                raise
+            task = self._loop.create_task(self._flush_in_slot(requests))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+    
+    async def _flush_in_slot(self, requests: List[Tuple[List[str], int, asyncio.Future]]) -> None:
+        try:
+            await self._flush(requests)
+        finally:
+            self._flush_slots.release()
+            _cancel_pending(requests)
+    
+    async def _flush(self, requests: List[Tuple[List[str], int, asyncio.Future]]) -> None:
+        texts = [text for request_texts, _, _ in requests for text in request_texts]
+        if len(requests) > 1:
+            logger.info(f"Embedding {len(texts)} chunks from {len(requests)} documents together")
+        rejected: List[int] = []
+        try:
+            embeddings = await generate_embeddings(texts, dtype=self.dtype, rejected=rejected)
+        except Exception as e:
+            # Inputs the API rejects are already recorded one by one, so what is
+            # left (rate limits, timeouts, auth) affects the whole batch; fail
+            # every document instead of retrying each against a struggling API
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        rejected.sort()
+        offset = 0
+        for request_texts, _, future in requests:
+            end = offset + len(request_texts)
+            request_embeddings = embeddings[offset:end]
+            request_rejected = [i - offset for i in rejected if offset <= i < end]
+            if not future.done():
+                if request_rejected:
+                    future.set_exception(EmbeddingInputsRejected(request_rejected, request_embeddings))
+                else:
+                    future.set_result(request_embeddings)
+            offset = end
+
+
+def _cancel_pending(requests: List[Tuple[List[str], int, asyncio.Future]]) -> None:
+    """Cancel the futures of requests that were not answered, so no document waits forever."""
+    for _, _, future in requests:
+        if not future.done():
+            future.cancel()
+
+
+embedding_batcher = EmbeddingBatcher()
+
+
+async def close_embedding_batcher() -> None:
+    """Stop the embedding batcher worker and cancel requests still waiting on it."""
+    await embedding_batcher.close()
+
+
+def _get_adaptive_chunk_size(text: str) -> int:
+    """
+    Pick a chunk size for a document from its token count.
+    
+    The token budget per chunk shrinks for large documents, then is converted
+    to characters using the document's own characters-per-token ratio, so text
+    that tokenizes densely (CJK, code) gets proportionally shorter chunks. The
+    result never exceeds MAX_CHUNK_SIZE characters.
+    
+    Tokenizes the whole document, so call it off the event loop.
+    
+    Args:
+        text: The full document text
+        
+    Returns:
+        int: Chunk size in characters, as expected by chunk_document
+    """
+    token_count = _count_embedding_tokens([text])[0] if text else 0
+    if token_count == 0:
+        return MAX_CHUNK_SIZE
+    
+    if token_count <= LARGE_DOCUMENT_TOKENS:
+        token_budget = MAX_CHUNK_TOKENS
+    else:
+        token_budget = MAX_CHUNK_TOKENS // 2
+    
+    chars_per_token = len(text) / token_count
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, int(token_budget * chars_per_token)))
+
+
+async def _embed_chunks(texts: List[str], chunk_size: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Embed chunk texts, re-chunking only the chunks the embeddings API rejects.
+    
+    Each rejected chunk is split again with half the chunk size and its pieces
+    take its place, down to MIN_CHUNK_SIZE. Accepted chunks are not re-embedded.
+    
+    Args:
+        texts: Chunk texts to embed
+        chunk_size: Chunk size the texts were produced with
+        
+    Returns:
+        Tuple[List[str], np.ndarray]: Final chunk texts in document order and
+        their embedding matrix
+    """
+    try:
+        return texts, await embedding_batcher.embed(texts)
+    except EmbeddingInputsRejected as e:
+        if chunk_size <= MIN_CHUNK_SIZE:
+            raise
+        smaller_size = max(MIN_CHUNK_SIZE, chunk_size // 2)
+        logger.warning(f"{len(e.rejected)} chunks rejected by the embeddings API, re-chunking them with size {smaller_size}")
+        
+        async def rechunk(text: str) -> Tuple[List[str], np.ndarray]:
+            pieces, _ = await chunk_document(text, chunk_size=smaller_size)
+            return await _embed_chunks(pieces, smaller_size)
+        
+        replacements = dict(zip(e.rejected, await asyncio.gather(*(rechunk(texts[i]) for i in e.rejected))))
+        final_texts: List[str] = []
+        rows: List[np.ndarray] = []
+        for i, text in enumerate(texts):
+            if i in replacements:
+                piece_texts, piece_embeddings = replacements[i]
+                final_texts.extend(piece_texts)
+                rows.append(piece_embeddings)
+            else:
+                final_texts.append(text)
+                rows.append(e.embeddings[i:i + 1])
+        return final_texts, np.concatenate(rows)
+
+
 async def process_document(file_path: str, file_type: str, document_id: str, user_id: str, metadata: Dict[str, Any] = None, chunk_size: int = None) -> Dict[str, Any]:
     """
     Process a document: extract text, chunk it, generate embeddings, and store in vector database.
@@ -617,6 +1025,9 @@ async def process_document(file_path: str, file_type: str, document_id: str, use
         text = await extract_text_from_document(file_path, file_type)
         logger.info(f"Extracted {len(text)} characters of text")
         
+        # The original file is not read again, so keep it from crowding the page cache
+        drop_from_page_cache(file_path)
+        
         # Prepare document metadata
         logger.info(f"Preparing metadata with: {metadata}")
         doc_metadata = {
@@ -628,44 +1039,29 @@ async def process_document(file_path: str, file_type: str, document_id: str, use
         }
         logger.info(f"Final metadata: {doc_metadata}")
         
-        # Chunk the document
-        logger.info(f"Chunking document with size: {chunk_size if chunk_size else 'default'}")
-        chunks = await chunk_document(text, doc_metadata, chunk_size)
-        logger.info(f"Created {len(chunks)} chunks")
+        # Chunk the document; counting its tokens is CPU-bound, so keep it off the event loop
+        if chunk_size is None:
+            chunk_size = await run_in_threadpool(_get_adaptive_chunk_size, text)
+        logger.info(f"Chunking document with size: {chunk_size}")
+        chunk_texts, chunk_metadatas = await chunk_document(text, doc_metadata, chunk_size)
+        logger.info(f"Created {len(chunk_texts)} chunks")
         
-        # Extract just the text for embedding
-        logger.info("Extracting text for embeddings")
-        chunk_texts = []
-        for i, chunk in enumerate(chunks):
-            try:
-                chunk_texts.append(chunk["text"])
-            except Exception as e:
-                logger.error(f"Error extracting text from chunk {i}: {str(e)}")
-                logger.error(f"Chunk data: {chunk}")
-                raise
-        
-        # Generate embeddings
+        # Embed the chunks; chunks the embedding API rejects as too long are split further
         logger.info(f"Generating embeddings for {len(chunk_texts)} chunks")
-        embeddings = await generate_embeddings(chunk_texts)
+        embedded_texts, embeddings = await _embed_chunks(chunk_texts, chunk_size)
+        if embedded_texts is not chunk_texts:
+            chunk_texts = embedded_texts
+            chunk_metadatas = [{"chunk_index": i, **doc_metadata} for i in range(len(chunk_texts))]
+            logger.info(f"Re-chunked into {len(chunk_texts)} chunks")
         logger.info(f"Generated {len(embeddings)} embeddings")
         
-        # Add embeddings to chunks
-        logger.info("Adding embeddings to chunks")
-        for i, embedding in enumerate(embeddings):
-            try:
-                chunks[i]["embedding"] = embedding
-            except Exception as e:
-                logger.error(f"Error adding embedding to chunk {i}: {str(e)}")
-                logger.error(f"Chunk data: {chunks[i] if i < len(chunks) else 'index out of range'}")
-                raise
-        
         # Store in vector database (implementation depends on your vector DB choice)
         # This is a placeholder - replace with actual vector DB storage code
-        await store_document_chunks(chunks, document_id, user_id)
+        await store_document_chunks(chunk_texts, chunk_metadatas, embeddings, document_id, user_id)
         
         return {
             "document_id": document_id,
-            "chunk_count": len(chunks),
+            "chunk_count": len(chunk_texts),
             "status": "processed",
             "text_length": len(text),
             "processed_at": doc_metadata["processed_at"]
@@ -676,12 +1072,46 @@ async def process_document(file_path: str, file_type: str, document_id: str, use
         raise Exception(f"Failed to process document: {str(e)}")
 
 
-async def store_document_chunks(chunks: List[Dict[str, Any]], document_id: str, user_id: str) -> bool:
+def _write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write a file in a single call through a temporary file and an atomic rename.
+    
+    Readers either see the previous file or the complete new one, never a
+    partially written file left behind by a crash.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
+
+
+def _serialize_embeddings(embeddings: np.ndarray) -> bytes:
+    """Serialize an embedding matrix in .npy format."""
+    buffer = io.BytesIO()
+    np.save(buffer, embeddings)
+    return buffer.getvalue()
+
+
+async def store_document_chunks(
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    embeddings: np.ndarray,
+    document_id: str,
+    user_id: str
+) -> bool:
     """
     Store document chunks in a vector database.
     
+    Chunks are passed column-wise so the embedding matrix can be handed to a
+    bulk insert as-is instead of being rebuilt row by row.
+    
     Args:
-        chunks: List of document chunks with embeddings
+        texts: Text of each chunk
+        metadatas: Metadata of each chunk, parallel to texts
+        embeddings: Embedding matrix with one row per chunk
         document_id: Unique ID for the document
         user_id: ID of the user who uploaded the document
         
@@ -692,110 +1122,44 @@ async def store_document_chunks(chunks: List[Dict[str, Any]], document_id: str,
     # For example, using Pinecone, Weaviate, Milvus, or PostgreSQL with pgvector
     
     try:
-        logger.info(f"Storing {len(chunks)} document chunks for document {document_id}")
+        logger.info(f"Storing {len(texts)} document chunks for document {document_id}")
         
-        # Example using a hypothetical vector DB client
-        # For actual implementation, replace with your chosen vector DB
+        if not len(texts) == len(metadatas) == len(embeddings):
+            raise ValueError(
+                f"Got {len(texts)} texts, {len(metadatas)} metadata entries and {len(embeddings)} embeddings"
+            )
         
-        # Prepare records for batch insertion
-        records = []
-        for i, chunk in enumerate(chunks):
-            try:
-                logger.info(f"Processing chunk {i} for storage")
-                
-                # Ensure metadata is a dictionary
-                if isinstance(chunk.get('metadata'), dict):
-                    chunk_index = chunk['metadata'].get('chunk_index', i)
-                    logger.info(f"Using metadata chunk_index: {chunk_index}")
-                else:
-                    chunk_index = i
-                    logger.info(f"Using default chunk_index: {i}, metadata type: {type(chunk.get('metadata'))}")
-                    if chunk.get('metadata') is not None:
-                        logger.info(f"Metadata value: {chunk.get('metadata')}")
-                
-                # Ensure text is present
-                if 'text' not in chunk:
-                    logger.error(f"Missing 'text' in chunk {i}: {chunk}")
-                    raise KeyError(f"Missing 'text' in chunk {i}")
-                    
-                # Ensure embedding is present
-                if 'embedding' not in chunk:
-                    logger.error(f"Missing 'embedding' in chunk {i}: {chunk}")
-                    raise KeyError(f"Missing 'embedding' in chunk {i}")
-                
-                records.append({
-                    "id": f"{document_id}_chunk_{chunk_index}",
-                    "values": chunk["embedding"],
-                    "metadata": chunk.get("metadata", {}),
-                    "text": chunk["text"]
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing chunk {i} for storage: {str(e)}")
-                logger.error(f"Chunk data: {chunk}")
-                raise
+        ids = [
+            f"{document_id}_chunk_{metadata.get('chunk_index', i)}"
+            for i, metadata in enumerate(metadatas)
+        ]
         
         # Store in vector DB (placeholder)
-        # vector_db_client.upsert(index_name="documents", namespace=user_id, vectors=records)
+        # vector_db_client.upsert(index_name="documents", namespace=user_id, ids=ids, vectors=embeddings, metadata=metadatas)
         
         # For now, just log that we would store these chunks
-        logger.info(f"Would store {len(chunks)} chunks for document {document_id} in vector DB")
+        logger.info(f"Would store {len(texts)} chunks for document {document_id} in vector DB")
         
-        # Also store in a local JSON file for testing purposes
+        # Also store in local files for testing purposes
         output_dir = Path("./document_chunks")
         output_dir.mkdir(exist_ok=True)
         
-        # Remove embeddings to make the JSON file smaller
-        logger.info("Creating simplified chunks for JSON storage")
-        simplified_chunks = []
-        for i, chunk in enumerate(chunks):
-            try:
-                logger.info(f"Processing chunk {i} for JSON storage")
-                
-                # Ensure metadata is a dictionary
-                if isinstance(chunk.get('metadata'), dict):
-                    chunk_index = chunk['metadata'].get('chunk_index', i)
-                    metadata = chunk['metadata']
-                    logger.info(f"Using metadata from chunk: {chunk_index}")
-                else:
-                    chunk_index = i
-                    metadata = {"chunk_index": i}
-                    logger.info(f"Created default metadata for chunk {i}")
-                
-                # Ensure text is present
-                if 'text' not in chunk:
-                    logger.error(f"Missing 'text' in chunk {i} for JSON storage: {chunk}")
-                    # Use a placeholder instead of failing
-                    text = f"[Missing text for chunk {i}]"
-                else:
-                    text = chunk["text"]
-                    
-                # Get embedding size if available
-                if "embedding" in chunk:
-                    try:
-                        embedding_size = len(chunk["embedding"])
-                    except Exception as e:
-                        logger.error(f"Error getting embedding size: {str(e)}")
-                        embedding_size = 0
-                else:
-                    embedding_size = 0
-                
-                simplified_chunk = {
-                    "id": f"{document_id}_chunk_{chunk_index}",
-                    "metadata": metadata,
-                    "text": text,
-                    "embedding_size": embedding_size
-                }
-                simplified_chunks.append(simplified_chunk)
-                
-            except Exception as e:
-                logger.error(f"Error processing chunk {i} for JSON storage: {str(e)}")
-                logger.error(f"Chunk data: {chunk}")
-                # Continue with other chunks instead of failing completely
-                continue
+        # Keep embeddings out of the JSON file; they go to a binary .npy beside it
+        _write_atomic(output_dir / f"{document_id}_embeddings.npy", _serialize_embeddings(embeddings))
+        embedding_size = embeddings.shape[1] if embeddings.ndim == 2 else 0
+        
+        simplified_chunks = [
+            {
+                "id": chunk_id,
+                "metadata": metadata,
+                "text": text,
+                "embedding_size": embedding_size
+            }
+            for chunk_id, metadata, text in zip(ids, metadatas, texts)
+        ]
         
-        with open(output_dir / f"{document_id}_chunks.json", "w") as f:
-            json.dump(simplified_chunks, f, indent=2)
+        # Written last: an existing chunks file marks the document as processed
+        _write_atomic(output_dir / f"{document_id}_chunks.json", json.dumps(simplified_chunks, indent=2).encode("utf-8"))
         
         return True
         
@@ -820,7 +1184,7 @@ async def search_document_chunks(query: str, user_id: str, document_ids: List[st
     try:
         # Generate embedding for the query
         query_embedding = await generate_embeddings([query])
-        if not query_embedding or len(query_embedding) == 0:
+        if len(query_embedding) == 0:
             raise ValueError("Failed to generate query embedding")
             
         # This is a placeholder - replace with your actual vector DB search implementation
@@ -1144,3 +1508,40 @@ async def get_document_chunks(document_id: str, user_id: str) -> List[Dict[str,
     except Exception as e:
         logger.error(f"Error getting document chunks: {str(e)}")
         return []
+
+
+def _clone_chunk_files(source_document_id: str, document_id: str, metadata: Optional[Dict[str, Any]]) -> int:
+    output_dir = Path("./document_chunks")
+    with open(output_dir / f"{source_document_id}_chunks.json", "r") as f:
+        chunks = json.load(f)
+    
+    for i, chunk in enumerate(chunks):
+        chunk_metadata = {**chunk.get("metadata", {}), **(metadata or {}), "document_id": document_id}
+        chunk["id"] = f"{document_id}_chunk_{chunk_metadata.get('chunk_index', i)}"
+        chunk["metadata"] = chunk_metadata
+    
+    embeddings_file = output_dir / f"{source_document_id}_embeddings.npy"
+    if embeddings_file.exists():
+        _write_atomic(output_dir / f"{document_id}_embeddings.npy", embeddings_file.read_bytes())
+    
+    _write_atomic(output_dir / f"{document_id}_chunks.json", json.dumps(chunks, indent=2).encode("utf-8"))
+    
+    return len(chunks)
+
+
+async def clone_document_chunks(source_document_id: str, document_id: str, metadata: Dict[str, Any] = None) -> int:
+    """
+    Reuse the processed chunks of an identical document for a new document.
+    
+    The chunk and embedding files are read and written in the threadpool so
+    the upload request does not block the event loop.
+    
+    Args:
+        source_document_id: ID of the already processed document
+        document_id: ID of the new document
+        metadata: Metadata of the new document, merged into each chunk
+        
+    Returns:
+        int: Number of chunks copied
+    """
+    return await run_in_threadpool(_clone_chunk_files, source_document_id, document_id, metadata)
@@ -4,12 +4,12 @@ Supports local file system, AWS S3, and Google Cloud Storage.
 """
 import os
 import shutil
-import aiofiles
 import logging
 from pathlib import Path
 from fastapi import UploadFile
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.utils.uploads import save_upload_file
 from datetime import timedelta
 
 # Configure logger
@@ -168,14 +168,8 @@ class StorageService:
                 # Save file path
                 file_path = doc_dir / file_name
                 
-                # Save file using async I/O
-                async with aiofiles.open(file_path, "wb") as buffer:
-                    # Read file content into memory first to avoid blocking I/O
-                    content = await file.read()
-                    await buffer.write(content)
-                
-                # Get file size
-                file_size = os.path.getsize(file_path)
+                # Stream file to disk in fixed-size chunks
+                file_size = await save_upload_file(file, file_path)
                 
                 # Return file metadata
                 return {
@@ -1,4 +1,5 @@
 from typing import Optional, List, Dict, Any
+from sqlalchemy import exists, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
@@ -20,6 +21,23 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
+def email_exists(db: Session, email: str, exclude_user_id: Optional[str] = None) -> bool:
+    """Check whether an email is registered, without loading the user.
+    
+    Args:
+        db: Database session
+        email: Email address to look up
+        exclude_user_id: Ignore this user (e.g. the one changing its email)
+    
+    Returns:
+        True if another user has this email
+    """
+    condition = User.email == email
+    if exclude_user_id is not None:
+        condition = condition & (User.id != exclude_user_id)
+    return db.scalar(select(exists().where(condition)))
+
+
 def get_user_by_oauth(db: Session, provider: str, oauth_user_id: str) -> Optional[User]:
     """Get a user by OAuth provider and ID."""
     return db.query(User).filter(
@@ -88,8 +106,7 @@ def get_users(db: Session, skip: int = 0, limit: int = 100,
 def create_user(db: Session, user_in: UserCreate) -> User:
     """Create a new user."""
     # Check if user with this email already exists
-    db_user = get_user_by_email(db, email=user_in.email)
-    if db_user:
+    if email_exists(db, email=user_in.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
@@ -184,8 +201,7 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
     # Update user fields if provided
     if user_in.email is not None:
         # Check if email is already taken by another user
-        existing_user = get_user_by_email(db, email=user_in.email)
-        if existing_user and existing_user.id != user.id:
+        if email_exists(db, email=user_in.email, exclude_user_id=user.id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
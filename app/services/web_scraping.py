@@ -12,6 +12,9 @@ import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Scrape responses carry full HTML and screenshots, so cap how many are in flight
+MAX_CONCURRENT_SCRAPES = 8
+
 class FirecrawlService:
     def __init__(self):
         self.api_key = os.getenv("FIRECRAWL_API_KEY")
@@ -180,9 +183,14 @@ class FirecrawlService:
         }
     
     async def scrape_multiple_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
-        """Scrape multiple URLs concurrently"""
-        tasks = [self.scrape_url(url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        """Scrape multiple URLs concurrently, with a bounded number in flight"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
+        
+        async def guarded_scrape(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.scrape_url(url)
+        
+        results = await asyncio.gather(*(guarded_scrape(url) for url in urls), return_exceptions=True)
         
         processed_results = []
         for i, result in enumerate(results):
@@ -11,6 +11,8 @@ import logging
 import re
 from urllib.parse import urlparse, parse_qs
 
+from starlette.concurrency import run_in_threadpool
+
 # YouTube transcript extraction
 try:
     from youtube_transcript_api import YouTubeTranscriptApi
@@ -28,6 +30,13 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Video ID patterns, compiled once and tried in order
+VIDEO_ID_PATTERNS = (
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)'),
+    re.compile(r'youtube\.com\/v\/([^&\n?#]+)'),
+    re.compile(r'youtube\.com\/watch\?.*v=([^&\n?#]+)'),
+)
+
 class YouTubeProcessor:
     def __init__(self):
         self.youtube_api_key = os.getenv("YOUTUBE_API_KEY")
@@ -54,14 +63,8 @@ class YouTubeProcessor:
     
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract YouTube video ID from URL"""
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
-            r'youtube\.com\/v\/([^&\n?#]+)',
-            r'youtube\.com\/watch\?.*v=([^&\n?#]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in VIDEO_ID_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1)
         
@@ -162,63 +165,69 @@ class YouTubeProcessor:
             if not languages:
                 languages = ['en', 'en-US', 'en-GB']
             
-            # Try to get transcript in preferred languages
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-            transcript = None
-            
-            # Try to find transcript in preferred languages
-            for lang in languages:
-                try:
-                    transcript = transcript_list.find_transcript([lang])
-                    break
-                except:
-                    continue
-            
-            # If no preferred language found, try auto-generated English
-            if not transcript:
-                try:
-                    transcript = transcript_list.find_generated_transcript(['en'])
-                except:
-                    # Get any available transcript
-                    available_transcripts = list(transcript_list)
-                    if available_transcripts:
-                        transcript = available_transcripts[0]
-            
-            if not transcript:
-                return {"error": "No transcript available"}
-            
-            # Fetch transcript data
-            transcript_data = transcript.fetch()
-            
-            # Format transcript
-            formatter = TextFormatter()
-            formatted_transcript = formatter.format_transcript(transcript_data)
-            
-            # Extract detailed transcript with timestamps
-            detailed_transcript = []
-            for entry in transcript_data:
-                detailed_transcript.append({
-                    "start": entry.get("start", 0),
-                    "duration": entry.get("duration", 0),
-                    "text": entry.get("text", "")
-                })
-            
-            return {
-                "video_id": video_id,
-                "language": transcript.language,
-                "language_code": transcript.language_code,
-                "is_generated": transcript.is_generated,
-                "is_translatable": transcript.is_translatable,
-                "full_transcript": formatted_transcript,
-                "detailed_transcript": detailed_transcript,
-                "word_count": len(formatted_transcript.split()),
-                "duration_seconds": sum(entry.get("duration", 0) for entry in transcript_data)
-            }
+            # The transcript API does blocking HTTP; run it off the event loop so
+            # concurrent metadata and transcript fetches actually overlap
+            return await run_in_threadpool(self._fetch_transcript, video_id, languages)
             
         except Exception as e:
             logger.error(f"Failed to get transcript for video {video_id}: {e}")
             return {"error": str(e)}
 
+    def _fetch_transcript(self, video_id: str, languages: List[str]) -> Dict[str, Any]:
+        """Fetch and format a transcript with the blocking transcript API"""
+        # Try to get transcript in preferred languages
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        transcript = None
+        
+        # Try to find transcript in preferred languages
+        for lang in languages:
+            try:
+                transcript = transcript_list.find_transcript([lang])
+                break
+            except:
+                continue
+        
+        # If no preferred language found, try auto-generated English
+        if not transcript:
+            try:
+                transcript = transcript_list.find_generated_transcript(['en'])
+            except:
+                # Get any available transcript
+                available_transcripts = list(transcript_list)
+                if available_transcripts:
+                    transcript = available_transcripts[0]
+        
+        if not transcript:
+            return {"error": "No transcript available"}
+        
+        # Fetch transcript data
+        transcript_data = transcript.fetch()
+        
+        # Format transcript
+        formatter = TextFormatter()
+        formatted_transcript = formatter.format_transcript(transcript_data)
+        
+        # Extract detailed transcript with timestamps
+        detailed_transcript = []
+        for entry in transcript_data:
+            detailed_transcript.append({
+                "start": entry.get("start", 0),
+                "duration": entry.get("duration", 0),
+                "text": entry.get("text", "")
+            })
+        
+        return {
+            "video_id": video_id,
+            "language": transcript.language,
+            "language_code": transcript.language_code,
+            "is_generated": transcript.is_generated,
+            "is_translatable": transcript.is_translatable,
+            "full_transcript": formatted_transcript,
+            "detailed_transcript": detailed_transcript,
+            "word_count": len(formatted_transcript.split()),
+            "duration_seconds": sum(entry.get("duration", 0) for entry in transcript_data)
+        }
+
     async def _fetch_og_from_page(self, url: str) -> Dict[str, Any]:
         """Fetch Open Graph metadata directly from the video page as a fallback.
         Returns a dict with keys like og:title, og:description, og:site_name, og:image.
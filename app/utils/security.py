@@ -1,12 +1,19 @@
+import base64
+import binascii
+import logging
 import secrets
 import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from sqlalchemy.orm import Session
 from jose import jwt
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 def generate_verification_token(email: str) -> str:
     """Generate a secure token for email verification."""
@@ -88,3 +95,66 @@ def verify_password_reset_token(token: str) -> Optional[str]:
         return payload.get("sub")
     except jwt.JWTError:
         return None
+
+
+# Size of the random nonce prepended to every encrypted OAuth token
+OAUTH_TOKEN_NONCE_SIZE = 12
+
+# ChaCha20-Poly1305 only accepts 256-bit keys
+OAUTH_TOKEN_KEY_SIZE = 32
+
+
+def _oauth_token_key() -> bytes:
+    """Return the raw OAuth token encryption key."""
+    if settings.OAUTH_TOKEN_ENCRYPTION_KEY:
+        return base64.urlsafe_b64decode(settings.OAUTH_TOKEN_ENCRYPTION_KEY)
+    return hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+
+
+def validate_oauth_token_key() -> None:
+    """
+    Check the OAuth token encryption key at startup instead of on first use.
+    
+    Raises:
+        ValueError: If OAUTH_TOKEN_ENCRYPTION_KEY is not urlsafe base64 of 32 bytes
+    """
+    try:
+        key = _oauth_token_key()
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("OAUTH_TOKEN_ENCRYPTION_KEY must be urlsafe base64") from e
+    if len(key) != OAUTH_TOKEN_KEY_SIZE:
+        raise ValueError(
+            f"OAUTH_TOKEN_ENCRYPTION_KEY must decode to {OAUTH_TOKEN_KEY_SIZE} bytes, got {len(key)}"
+        )
+    if not settings.OAUTH_TOKEN_ENCRYPTION_KEY:
+        logger.warning(
+            "OAUTH_TOKEN_ENCRYPTION_KEY is not set; OAuth tokens are encrypted with a key "
+            "derived from SECRET_KEY and become unreadable if SECRET_KEY changes"
+        )
+
+
+def _oauth_token_cipher() -> ChaCha20Poly1305:
+    """Build the AEAD cipher used for OAuth tokens stored in the database."""
+    return ChaCha20Poly1305(_oauth_token_key())
+
+
+def encrypt_oauth_token(token: str) -> bytes:
+    """Encrypt an OAuth token as nonce + ChaCha20-Poly1305 ciphertext."""
+    nonce = secrets.token_bytes(OAUTH_TOKEN_NONCE_SIZE)
+    return nonce + _oauth_token_cipher().encrypt(nonce, token.encode(), None)
+
+
+def decrypt_oauth_token(blob: bytes) -> Optional[str]:
+    """
+    Decrypt an OAuth token produced by encrypt_oauth_token.
+    
+    Returns None when the blob was encrypted with a different key, e.g. after
+    SECRET_KEY rotated, so the user is asked to re-authenticate instead of
+    every query on the row failing.
+    """
+    nonce, ciphertext = blob[:OAUTH_TOKEN_NONCE_SIZE], blob[OAUTH_TOKEN_NONCE_SIZE:]
+    try:
+        return _oauth_token_cipher().decrypt(nonce, ciphertext, None).decode()
+    except InvalidTag:
+        logger.warning("Could not decrypt stored OAuth token; the encryption key has changed")
+        return None
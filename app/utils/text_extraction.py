@@ -0,0 +1,73 @@
+"""
+Synchronous text extraction for document files, run in worker processes
+
+This module deliberately imports nothing from the application so worker
+processes started with the spawn method stay cheap to boot.
+"""
+import os
+
+
+def extract_text_sync(file_path: str, file_type: str) -> str:
+    """
+    Extract text from a PDF, DOCX, plain text or CSV file
+
+    Must stay a top-level function so it can be pickled for a process pool.
+
+    Args:
+        file_path: Path to the document file
+        file_type: MIME type of the file
+
+    Returns:
+        Extracted text content
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    if file_type == "application/pdf":
+        return _extract_pdf_text(file_path)
+
+    if file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        import docx
+
+        doc = docx.Document(file_path)
+        return "\n\n".join(paragraph.text for paragraph in doc.paragraphs)
+
+    if file_type == "text/plain":
+        with open(file_path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    if file_type == "text/csv":
+        import pandas as pd
+
+        return pd.read_csv(file_path).to_string()
+
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def _extract_pdf_text(file_path: str) -> str:
+    """
+    Extract text from a PDF, one page per paragraph block
+
+    Uses PyMuPDF when it is installed and falls back to PyPDF2 for
+    deployments that cannot ship the AGPL-licensed MuPDF.
+
+    Args:
+        file_path: Path to the PDF file
+
+    Returns:
+        Extracted text content
+    """
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+    if fitz is not None:
+        with fitz.open(file_path) as doc:
+            return "".join(page.get_text("text") + "\n\n" for page in doc)
+
+    import PyPDF2
+
+    with open(file_path, "rb") as file:
+        reader = PyPDF2.PdfReader(file)
+        return "".join(page.extract_text() + "\n\n" for page in reader.pages)
@@ -0,0 +1,106 @@
+"""
+Utility functions for persisting uploaded files to local storage
+"""
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import aiofiles
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# Read uploads in 1 MiB pieces so peak memory stays bounded by the chunk size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _copy_fd_to_path(src_fd: int, file_path: Union[str, Path], hasher: Optional[Any] = None) -> int:
+    """
+    Copy an open file descriptor to a path in a single pass
+
+    Without a hasher the copy stays in-kernel with os.sendfile. With a hasher
+    the bytes have to pass through userspace anyway, so each chunk is read
+    once, hashed and written, rather than copied with sendfile and read back.
+
+    Args:
+        src_fd: Source file descriptor, read from offset 0
+        file_path: Destination path on the local file system
+        hasher: Optional hashlib object fed with the source bytes
+
+    Returns:
+        Number of bytes written
+    """
+    dst_fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        offset = 0
+        if hasher is None:
+            while sent := os.sendfile(dst_fd, src_fd, offset, UPLOAD_CHUNK_SIZE):
+                offset += sent
+            return offset
+
+        while chunk := os.pread(src_fd, UPLOAD_CHUNK_SIZE, offset):
+            hasher.update(chunk)
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(dst_fd, view):]
+            offset += len(chunk)
+        return offset
+    finally:
+        os.close(dst_fd)
+
+
+async def save_upload_file(
+    file: UploadFile,
+    file_path: Union[str, Path],
+    hasher: Optional[Any] = None
+) -> int:
+    """
+    Stream an uploaded file to disk without buffering it in memory
+
+    Uploads that Starlette already spooled to a temporary file on disk are
+    copied in one blocking pass on a worker thread: with os.sendfile, skipping
+    the userspace buffer, when no hasher is given. In-memory spools are
+    streamed through aiofiles in fixed-size chunks.
+
+    Args:
+        file: Uploaded file
+        file_path: Destination path on the local file system
+        hasher: Optional hashlib object (e.g. hashlib.sha256()) fed with the
+            uploaded bytes, for content fingerprinting
+
+    Returns:
+        Number of bytes written
+    """
+    if hasattr(os, "sendfile") and getattr(file.file, "_rolled", False):
+        return await run_in_threadpool(_copy_fd_to_path, file.file.fileno(), file_path, hasher)
+
+    size = 0
+    async with aiofiles.open(file_path, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await out.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def drop_from_page_cache(file_path: Union[str, Path]) -> None:
+    """
+    Advise the kernel to evict a file that will not be read again from the page cache
+
+    Best effort: a no-op where posix_fadvise is unavailable (e.g. Windows) or fails.
+
+    Args:
+        file_path: Path of the file on the local file system
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
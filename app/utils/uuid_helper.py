@@ -34,3 +34,24 @@ def convert_uuid_to_str(obj: Any) -> Any:
         return result
     else:
         return obj
+
+def is_valid_uuid(value: Any) -> bool:
+    """
+    Check whether a value parses as a UUID.
+    
+    Native UUID columns reject anything else with a DataError, so ids taken
+    from the URL should be checked before they reach a query.
+    
+    Args:
+        value: The value to check
+        
+    Returns:
+        True if the value is a UUID or a string in UUID format, False otherwise
+    """
+    if isinstance(value, uuid.UUID):
+        return True
+    try:
+        uuid.UUID(str(value))
+    except (ValueError, AttributeError, TypeError):
+        return False
+    return True
@@ -1,7 +1,7 @@
 import logging
 
 from app.db.init_db import init_db
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, engine, wait_for_database
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -9,8 +9,13 @@ logger = logging.getLogger(__name__)
 
 def main() -> None:
     logger.info("Creating initial data")
+    wait_for_database()
     db = SessionLocal()
-    init_db(db)
+    try:
+        init_db(db)
+    finally:
+        db.close()
+        engine.dispose()
     logger.info("Initial data created")
 
 
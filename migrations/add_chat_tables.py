@@ -45,9 +45,7 @@ def upgrade():
     )
     
     # Create indexes
-    op.create_index('ix_conversations_id', 'conversations', ['id'])
     op.create_index('ix_conversations_user_id', 'conversations', ['user_id'])
-    op.create_index('ix_messages_id', 'messages', ['id'])
     op.create_index('ix_messages_conversation_id', 'messages', ['conversation_id'])
 
 
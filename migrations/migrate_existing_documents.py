@@ -123,7 +123,7 @@ async def migrate_document_chunks(document_id, chunks_file, db):
                 chunk_index=i,
                 text=chunk["text"],
                 embedding=chunk.get("embedding"),
-                metadata=chunk.get("metadata", {})
+                chunk_metadata=chunk.get("metadata", {})
             )
             db.add(db_chunk)
         
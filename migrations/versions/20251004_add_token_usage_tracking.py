@@ -8,6 +8,8 @@ Create Date: 2025-10-04 20:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
+from psycopg2.extras import execute_values
+import uuid
 
 # revision identifiers, used by Alembic.
 revision = '20251004_token_usage'
@@ -15,11 +17,126 @@ down_revision = 'previous_revision_id'  # Replace with the actual previous revis
 branch_labels = None
 depends_on = None
 
+# Up to this many users the preference/statistics backfill is built in Python
+# and sent with execute_values; larger tables stay fully server-side.
+PYTHON_BACKFILL_MAX_USERS = 100000
+
+UPDATE_SUBSCRIPTION_LIMITS = """
+    UPDATE subscriptions 
+    SET token_limit = CASE 
+        WHEN plan = 'free' THEN 100000
+        WHEN plan = 'basic' THEN 500000
+        ELSE NULL
+    END,
+    max_model_tier = CASE 
+        WHEN plan = 'free' THEN 'gpt-3.5-turbo'
+        WHEN plan = 'basic' THEN 'gpt-4'
+        WHEN plan = 'professional' THEN 'gpt-4-turbo'
+        ELSE 'gpt-3.5-turbo'
+    END
+    RETURNING id
+"""
+
+SELECT_USER_PLANS = """
+    SELECT 
+        users.id AS user_id,
+        COALESCE(bool_or(subscriptions.plan = 'free'), false) AS has_free,
+        COALESCE(bool_or(subscriptions.plan = 'basic'), false) AS has_basic,
+        COALESCE(bool_or(subscriptions.plan = 'professional'), false) AS has_professional
+    FROM users
+    LEFT JOIN subscriptions ON subscriptions.user_id = users.id
+    GROUP BY users.id
+"""
+
+
+def _default_model(has_professional, has_basic):
+    if has_professional:
+        return 'gpt-4-turbo'
+    if has_basic:
+        return 'gpt-4'
+    return 'gpt-3.5-turbo'
+
+
+def _tokens_limit(has_free, has_basic):
+    if has_free:
+        return 100000
+    if has_basic:
+        return 500000
+    return None
+
+
+def _backfill_server_side():
+    """Backfill limits, preferences and statistics in one data-modifying CTE."""
+    op.execute(f"""
+    WITH updated_subscriptions AS ({UPDATE_SUBSCRIPTION_LIMITS}),
+    user_plans AS ({SELECT_USER_PLANS}),
+    inserted_preferences AS (
+        INSERT INTO user_preferences (id, user_id, theme, notifications, default_model)
+        SELECT 
+            gen_random_uuid()::text, 
+            user_id, 
+            'light', 
+            true, 
+            CASE 
+                WHEN has_professional THEN 'gpt-4-turbo'
+                WHEN has_basic THEN 'gpt-4'
+                ELSE 'gpt-3.5-turbo'
+            END
+        FROM user_plans
+        RETURNING id
+    )
+    INSERT INTO usage_statistics (id, user_id, tokens_limit)
+    SELECT 
+        gen_random_uuid()::text, 
+        user_id, 
+        CASE 
+            WHEN has_free THEN 100000
+            WHEN has_basic THEN 500000
+            ELSE NULL
+        END
+    FROM user_plans
+    """)
+
+
+def _backfill_in_python(conn):
+    """Fetch user plans once and bulk insert the backfill rows with execute_values."""
+    user_plans = conn.execute(sa.text(
+        f"WITH updated_subscriptions AS ({UPDATE_SUBSCRIPTION_LIMITS}) {SELECT_USER_PLANS}"
+    )).fetchall()
+    
+    preferences = [
+        (str(uuid.uuid4()), plan.user_id, 'light', True,
+         _default_model(plan.has_professional, plan.has_basic))
+        for plan in user_plans
+    ]
+    statistics = [
+        (str(uuid.uuid4()), plan.user_id, _tokens_limit(plan.has_free, plan.has_basic))
+        for plan in user_plans
+    ]
+    
+    with conn.connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            "INSERT INTO user_preferences (id, user_id, theme, notifications, default_model) VALUES %s",
+            preferences,
+            page_size=10000
+        )
+        execute_values(
+            cursor,
+            "INSERT INTO usage_statistics (id, user_id, tokens_limit) VALUES %s",
+            statistics,
+            page_size=10000
+        )
+
 
 def upgrade():
     # Create enum types
     op.execute("CREATE TYPE request_type AS ENUM ('chat', 'plagiarism', 'prompt')")
-    op.execute("ALTER TYPE model_tier ADD VALUE 'gpt-4-turbo' AFTER 'gpt-4'")
+    
+    # Model tiers are stored as varchar guarded by a CHECK constraint instead of
+    # a Postgres enum: ALTER TYPE ... ADD VALUE cannot run inside the migration
+    # transaction, whereas a constraint can be swapped transactionally.
+    op.execute("DROP TYPE IF EXISTS model_tier")
     
     # Update subscriptions table
     op.add_column('subscriptions', sa.Column('is_active', sa.Boolean(), nullable=False, server_default='true'))
@@ -37,12 +154,11 @@ def upgrade():
         sa.Column('theme', sa.String(), nullable=True, server_default='light'),
         sa.Column('notifications', sa.Boolean(), nullable=True, server_default='true'),
         sa.Column('default_model', sa.String(), nullable=True, server_default='gpt-4'),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_user_preferences_id'), 'user_preferences', ['id'], unique=False)
     op.create_index(op.f('ix_user_preferences_user_id'), 'user_preferences', ['user_id'], unique=False)
     
     # Create usage_statistics table
@@ -55,19 +171,18 @@ def upgrade():
         sa.Column('prompts_generated', sa.Integer(), nullable=False, server_default='0'),
         sa.Column('tokens_used', sa.Integer(), nullable=False, server_default='0'),
         sa.Column('tokens_limit', sa.Integer(), nullable=True),
-        sa.Column('last_reset_date', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('last_reset_date', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_usage_statistics_id'), 'usage_statistics', ['id'], unique=False)
     op.create_index(op.f('ix_usage_statistics_user_id'), 'usage_statistics', ['user_id'], unique=False)
     
     # Create token_usage table
     op.create_table(
         'token_usage',
-        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
         sa.Column('user_id', sa.String(), nullable=False),
         sa.Column('request_type', sa.Enum('chat', 'plagiarism', 'prompt', name='request_type'), nullable=False),
         sa.Column('model', sa.String(), nullable=False),
@@ -75,11 +190,10 @@ def upgrade():
         sa.Column('completion_tokens', sa.Integer(), nullable=False, server_default='0'),
         sa.Column('total_tokens', sa.Integer(), nullable=False, server_default='0'),
         sa.Column('request_id', sa.String(), nullable=True),
-        sa.Column('timestamp', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_token_usage_id'), 'token_usage', ['id'], unique=False)
     op.create_index(op.f('ix_token_usage_user_id'), 'token_usage', ['user_id'], unique=False)
     op.create_index(op.f('ix_token_usage_timestamp'), 'token_usage', ['timestamp'], unique=False)
     op.create_index(op.f('ix_token_usage_request_type'), 'token_usage', ['request_type'], unique=False)
@@ -98,61 +212,27 @@ def upgrade():
         sa.Column('plagiarism_tokens', sa.Integer(), nullable=False, server_default='0'),
         sa.Column('prompt_generation_tokens', sa.Integer(), nullable=False, server_default='0'),
         sa.Column('total_tokens', sa.Integer(), nullable=False, server_default='0'),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('user_id', 'year', 'month', 'day')
     )
-    op.create_index(op.f('ix_token_usage_summary_id'), 'token_usage_summary', ['id'], unique=False)
     op.create_index(op.f('ix_token_usage_summary_user_id'), 'token_usage_summary', ['user_id'], unique=False)
     op.create_index(op.f('ix_token_usage_summary_date'), 'token_usage_summary', ['year', 'month', 'day'], unique=False)
     
-    # Set default token limits based on subscription plan
-    op.execute("""
-    UPDATE subscriptions 
-    SET token_limit = CASE 
-        WHEN plan = 'free' THEN 100000
-        WHEN plan = 'basic' THEN 500000
-        ELSE NULL
-    END,
-    max_model_tier = CASE 
-        WHEN plan = 'free' THEN 'gpt-3.5-turbo'
-        WHEN plan = 'basic' THEN 'gpt-4'
-        WHEN plan = 'professional' THEN 'gpt-4-turbo'
-        ELSE 'gpt-3.5-turbo'
-    END
-    """)
-    
-    # Create user preferences for existing users
-    op.execute("""
-    INSERT INTO user_preferences (id, user_id, theme, notifications, default_model)
-    SELECT 
-        gen_random_uuid()::text, 
-        id, 
-        'light', 
-        true, 
-        CASE 
-            WHEN EXISTS (SELECT 1 FROM subscriptions WHERE subscriptions.user_id = users.id AND plan = 'professional') THEN 'gpt-4-turbo'
-            WHEN EXISTS (SELECT 1 FROM subscriptions WHERE subscriptions.user_id = users.id AND plan = 'basic') THEN 'gpt-4'
-            ELSE 'gpt-3.5-turbo'
-        END
-    FROM users
-    """)
-    
-    # Create usage statistics for existing users
-    op.execute("""
-    INSERT INTO usage_statistics (id, user_id, tokens_limit)
-    SELECT 
-        gen_random_uuid()::text, 
-        users.id, 
-        CASE 
-            WHEN EXISTS (SELECT 1 FROM subscriptions WHERE subscriptions.user_id = users.id AND plan = 'free') THEN 100000
-            WHEN EXISTS (SELECT 1 FROM subscriptions WHERE subscriptions.user_id = users.id AND plan = 'basic') THEN 500000
-            ELSE NULL
-        END
-    FROM users
-    """)
+    # Backfill subscription limits, user preferences and usage statistics
+    conn = op.get_bind()
+    user_count = conn.execute(sa.text("SELECT count(*) FROM users")).scalar()
+    if user_count <= PYTHON_BACKFILL_MAX_USERS:
+        _backfill_in_python(conn)
+    else:
+        _backfill_server_side()
+    op.create_check_constraint(
+        'ck_model_tier',
+        'subscriptions',
+        "max_model_tier IN ('gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo')"
+    )
 
 
 def downgrade():
@@ -163,6 +243,7 @@ def downgrade():
     op.drop_table('user_preferences')
     
     # Drop columns from subscriptions
+    op.drop_constraint('ck_model_tier', 'subscriptions', type_='check')
     op.drop_column('subscriptions', 'is_active')
     op.drop_column('subscriptions', 'stripe_customer_id')
     op.drop_column('subscriptions', 'stripe_subscription_id')
@@ -27,13 +27,14 @@ def upgrade():
         sa.Column('section_title', sa.String(), nullable=False),
         sa.Column('content', sa.Text(), nullable=False),
         sa.Column('version', sa.Integer(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=True),
-        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.Column('content_metadata', JSON, nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['research_projects.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_generated_content_id'), 'generated_content', ['id'], unique=False)
+    # LLM output barely compresses; store it out of line without trying pglz
+    op.execute("ALTER TABLE generated_content ALTER COLUMN content SET STORAGE EXTERNAL")
     
     # Create content_feedback table
     op.create_table(
@@ -43,18 +44,15 @@ def upgrade():
         sa.Column('user_id', sa.String(), nullable=False),
         sa.Column('rating', sa.Integer(), nullable=False),
         sa.Column('comments', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=True),
-        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.Column('feedback_metadata', JSON, nullable=True),
         sa.ForeignKeyConstraint(['content_id'], ['generated_content.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_content_feedback_id'), 'content_feedback', ['id'], unique=False)
 
 
 def downgrade():
-    op.drop_index(op.f('ix_content_feedback_id'), table_name='content_feedback')
     op.drop_table('content_feedback')
-    op.drop_index(op.f('ix_generated_content_id'), table_name='generated_content')
     op.drop_table('generated_content')
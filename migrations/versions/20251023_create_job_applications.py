@@ -28,11 +28,10 @@ def upgrade():
         sa.Column('cover_letter', sa.Text(), nullable=True),
         sa.Column('status', sa.String(), nullable=False, server_default='submitted'),
         sa.Column('extra_data', sa.JSON(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_job_applications_id', 'job_applications', ['id'], unique=False)
     op.create_index('ix_job_applications_email', 'job_applications', ['email'], unique=False)
     op.create_index('ix_job_applications_role', 'job_applications', ['role'], unique=False)
 
@@ -40,5 +39,4 @@ def upgrade():
 def downgrade():
     op.drop_index('ix_job_applications_role', table_name='job_applications')
     op.drop_index('ix_job_applications_email', table_name='job_applications')
-    op.drop_index('ix_job_applications_id', table_name='job_applications')
     op.drop_table('job_applications')
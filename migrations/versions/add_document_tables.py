@@ -28,14 +28,14 @@ def upgrade():
         sa.Column('file_path', sa.String(), nullable=False),
         sa.Column('file_type', sa.String(), nullable=False),
         sa.Column('file_size', sa.Integer(), nullable=False),
-        sa.Column('upload_date', sa.DateTime(), nullable=False),
+        sa.Column('upload_date', sa.DateTime(timezone=True), nullable=False),
         sa.Column('processing_status', sa.String(), nullable=False),
         sa.Column('error_message', sa.Text(), nullable=True),
-        sa.Column('metadata', sa.JSON(), nullable=True),
+        sa.Column('document_metadata', sa.JSON(), nullable=True),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
+    op.execute("ALTER TABLE documents ALTER COLUMN document_metadata SET STORAGE EXTERNAL")
     op.create_index(op.f('ix_documents_user_id'), 'documents', ['user_id'], unique=False)
     
     # Create document_chunks table
@@ -50,17 +50,15 @@ def upgrade():
         sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_document_chunks_id'), 'document_chunks', ['id'], unique=False)
+    op.execute("ALTER TABLE document_chunks ALTER COLUMN metadata SET STORAGE EXTERNAL")
     op.create_index(op.f('ix_document_chunks_document_id'), 'document_chunks', ['document_id'], unique=False)
 
 
 def downgrade():
     # Drop document_chunks table
     op.drop_index(op.f('ix_document_chunks_document_id'), table_name='document_chunks')
-    op.drop_index(op.f('ix_document_chunks_id'), table_name='document_chunks')
     op.drop_table('document_chunks')
     
     # Drop documents table
     op.drop_index(op.f('ix_documents_user_id'), table_name='documents')
-    op.drop_index(op.f('ix_documents_id'), table_name='documents')
     op.drop_table('documents')
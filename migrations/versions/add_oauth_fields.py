@@ -6,7 +6,6 @@ Create Date: 2025-10-11
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,17 +16,17 @@ depends_on = None
 
 
 def upgrade():
-    # Make hashed_password nullable
-    op.alter_column('users', 'hashed_password',
-               existing_type=sa.String(),
-               nullable=True)
-    
-    # Add OAuth fields
-    op.add_column('users', sa.Column('oauth_provider', sa.String(), nullable=True))
-    op.add_column('users', sa.Column('oauth_user_id', sa.String(), nullable=True))
-    op.add_column('users', sa.Column('oauth_access_token', sa.String(), nullable=True))
-    op.add_column('users', sa.Column('oauth_refresh_token', sa.String(), nullable=True))
-    op.add_column('users', sa.Column('oauth_token_expires_at', sa.DateTime(), nullable=True))
+    # Make hashed_password nullable and add the OAuth fields in a single
+    # ALTER TABLE so the ACCESS EXCLUSIVE lock on users is taken only once
+    op.execute("""
+    ALTER TABLE users
+        ALTER COLUMN hashed_password DROP NOT NULL,
+        ADD COLUMN oauth_provider varchar,
+        ADD COLUMN oauth_user_id varchar,
+        ADD COLUMN oauth_access_token bytea,
+        ADD COLUMN oauth_refresh_token bytea,
+        ADD COLUMN oauth_token_expires_at timestamp
+    """)
     
     # Add index for oauth_user_id and provider combination
     op.create_index('ix_users_oauth_provider_id', 'users', ['oauth_provider', 'oauth_user_id'], unique=True)
@@ -36,13 +35,12 @@ def upgrade():
 def downgrade():
     # Drop OAuth fields
     op.drop_index('ix_users_oauth_provider_id', table_name='users')
-    op.drop_column('users', 'oauth_token_expires_at')
-    op.drop_column('users', 'oauth_refresh_token')
-    op.drop_column('users', 'oauth_access_token')
-    op.drop_column('users', 'oauth_user_id')
-    op.drop_column('users', 'oauth_provider')
-    
-    # Make hashed_password non-nullable again
-    op.alter_column('users', 'hashed_password',
-               existing_type=sa.String(),
-               nullable=False)
+    op.execute("""
+    ALTER TABLE users
+        DROP COLUMN oauth_token_expires_at,
+        DROP COLUMN oauth_refresh_token,
+        DROP COLUMN oauth_access_token,
+        DROP COLUMN oauth_user_id,
+        DROP COLUMN oauth_provider,
+        ALTER COLUMN hashed_password SET NOT NULL
+    """)
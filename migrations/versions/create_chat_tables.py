@@ -24,46 +24,42 @@ def upgrade():
     # Create conversations table
     op.create_table(
         'conversations',
-        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
         sa.Column('user_id', sa.String(), nullable=False),
         sa.Column('title', sa.String(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
-        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.text('true')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
     op.create_index(op.f('ix_conversations_user_id'), 'conversations', ['user_id'], unique=False)
     
     # Create messages table
     op.create_table(
         'messages',
-        sa.Column('id', sa.String(), nullable=False),
-        sa.Column('conversation_id', sa.String(), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('conversation_id', postgresql.UUID(as_uuid=True), nullable=False),
         sa.Column('role', sa.Enum('user', 'assistant', 'system', name='messageroletypes'), nullable=False),
         sa.Column('content', sa.Text(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('model', sa.String(), nullable=True),
         sa.Column('prompt_tokens', sa.Integer(), nullable=True),
         sa.Column('completion_tokens', sa.Integer(), nullable=True),
         sa.Column('total_tokens', sa.Integer(), nullable=True),
-        sa.Column('metadata', sa.JSON(), nullable=True),
+        sa.Column('message_metadata', sa.JSON(), nullable=True),
         sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
     op.create_index(op.f('ix_messages_conversation_id'), 'messages', ['conversation_id'], unique=False)
 
 
 def downgrade():
     # Drop tables
     op.drop_index(op.f('ix_messages_conversation_id'), table_name='messages')
-    op.drop_index(op.f('ix_messages_id'), table_name='messages')
     op.drop_table('messages')
     
     op.drop_index(op.f('ix_conversations_user_id'), table_name='conversations')
-    op.drop_index(op.f('ix_conversations_id'), table_name='conversations')
     op.drop_table('conversations')
     
     # Drop enum type
@@ -0,0 +1,32 @@
+"""
+Output helpers shared by the standalone check scripts in the project root
+"""
+import asyncio
+from functools import wraps
+
+
+def buffered_output(check):
+    """
+    Collect a check's report lines and print them in one write when it finishes
+
+    Keeps the output of checks that run concurrently from interleaving. The
+    wrapped check receives the line collector as its emit argument.
+    """
+    if asyncio.iscoroutinefunction(check):
+        @wraps(check)
+        async def async_wrapper(*args, **kwargs):
+            lines = []
+            try:
+                return await check(*args, emit=lines.append, **kwargs)
+            finally:
+                print("\n".join(lines), flush=True)
+        return async_wrapper
+
+    @wraps(check)
+    def wrapper(*args, **kwargs):
+        lines = []
+        try:
+            return check(*args, emit=lines.append, **kwargs)
+        finally:
+            print("\n".join(lines), flush=True)
+    return wrapper
@@ -17,6 +17,8 @@ import os
 import secrets
 import sys
 
+from dotenv import set_key
+
 
 def generate_secret_key(length: int = 32) -> str:
     """
@@ -46,21 +48,7 @@ def update_env_file(secret_key: str, env_file: str = '.env') -> bool:
         print(f"Error: {env_file} file not found.")
         return False
 
-    with open(env_file, 'r') as f:
-        lines = f.readlines()
-
-    with open(env_file, 'w') as f:
-        secret_key_found = False
-        for line in lines:
-            if line.startswith('SECRET_KEY='):
-                f.write(f'SECRET_KEY={secret_key}\n')
-                secret_key_found = True
-            else:
-                f.write(line)
-
-        if not secret_key_found:
-            f.write(f'\nSECRET_KEY={secret_key}\n')
-
+    set_key(env_file, 'SECRET_KEY', secret_key, quote_mode='never')
     return True
 
 
@@ -4,6 +4,8 @@ Health Check Script for Doztra Auth Service
 
 This script performs a health check on the Doztra Auth Service API.
 It can be used in monitoring systems or as a Kubernetes liveness probe.
+When imported by a long-running monitor, check_health reuses one keep-alive
+connection across calls instead of reconnecting every time.
 
 Usage:
     python health_check.py [--url URL] [--timeout TIMEOUT]
@@ -20,6 +22,22 @@ from typing import Dict, Any, Optional
 import urllib.request
 import urllib.error
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+_client: Optional["httpx.Client"] = None
+
+
+def _get_client() -> "httpx.Client":
+    """Create the keep-alive HTTP client on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.Client(limits=httpx.Limits(max_keepalive_connections=1))
+    return _client
+
 
 def check_health(url: str, timeout: int = 5) -> Dict[str, Any]:
     """
@@ -36,6 +54,15 @@ def check_health(url: str, timeout: int = 5) -> Dict[str, Any]:
         urllib.error.URLError: If the request fails
         json.JSONDecodeError: If the response is not valid JSON
     """
+    if HTTPX_AVAILABLE:
+        try:
+            response = _get_client().get(url, timeout=timeout)
+            # Fail on 4xx/5xx like urlopen does, whatever the body says
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise urllib.error.URLError(e) from e
+
     request = urllib.request.Request(url)
     with urllib.request.urlopen(request, timeout=timeout) as response:
         return json.loads(response.read().decode('utf-8'))
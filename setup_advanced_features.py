@@ -5,24 +5,59 @@ Installs dependencies and configures services
 """
 
 import os
+import re
+import shutil
 import subprocess
 import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Parallel pip processes used to download and install requirement shards
+PIP_INSTALL_WORKERS = 4
+
+# Milvus reports readiness on its metrics port once it can serve requests
+MILVUS_HEALTH_URL = "http://localhost:9091/healthz"
+MILVUS_STARTUP_TIMEOUT = 60
+
+# Skip pip's interactive prompts and its version check on every invocation
+PIP_ENV = {**os.environ, "PIP_NO_INPUT": "1", "PIP_DISABLE_PIP_VERSION_CHECK": "1"}
+
 def run_command(command, description):
-    """Run a shell command and handle errors"""
+    """Run a command given as an argument list (no intermediate shell) and handle errors"""
     print(f"🔧 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        subprocess.run(command, check=True, capture_output=True, text=True)
         print(f"✅ {description} completed")
         return True
+    except FileNotFoundError as e:
+        print(f"❌ {description} failed: {e}")
+        return False
     except subprocess.CalledProcessError as e:
         print(f"❌ {description} failed: {e.stderr}")
         return False
 
+# Names in the project directory, read once with os.scandir on first use
+_project_entries = None
+
+def project_entries():
+    """Return the set of names in the project directory, listing it only once per run"""
+    global _project_entries
+    if _project_entries is None:
+        with os.scandir(".") as entries:
+            _project_entries = {entry.name for entry in entries}
+    return _project_entries
+
 def check_file_exists(file_path, description):
     """Check if a file exists"""
-    if Path(file_path).exists():
+    # The cached listing only covers the project root; nested paths are stat'ed
+    if os.sep in file_path or "/" in file_path:
+        exists = Path(file_path).exists()
+    else:
+        exists = file_path in project_entries()
+    if exists:
         print(f"✅ {description} found")
         return True
     else:
@@ -34,15 +69,15 @@ def create_env_file():
     env_template = Path(".env.template")
     env_file = Path(".env")
     
-    if env_file.exists():
+    if env_file.name in project_entries():
         print("✅ .env file already exists")
         return True
     
-    if env_template.exists():
+    if env_template.name in project_entries():
         print("📝 Creating .env file from template...")
         try:
-            content = env_template.read_text()
-            env_file.write_text(content)
+            shutil.copyfile(env_template, env_file)
+            project_entries().add(env_file.name)
             print("✅ .env file created successfully")
             print("⚠️  Please review and update the .env file with your specific configuration")
             return True
@@ -53,70 +88,173 @@ def create_env_file():
         print("❌ .env.template not found")
         return False
 
+def read_requirement_shards(requirements_file, shard_count):
+    """Split a requirements file into shards, keeping all lines of one package together"""
+    packages = {}
+    for line in Path(requirements_file).read_text().splitlines():
+        requirement = line.split(" #", 1)[0].strip()
+        if not requirement or requirement.startswith("#"):
+            continue
+        if requirement.startswith("-"):
+            # Options such as -r or --index-url apply to the whole file
+            return None
+        name = re.split(r"[\[=<>!~;\s]", requirement, 1)[0].lower().replace("_", "-")
+        packages.setdefault(name, []).append(requirement)
+    
+    shards = [[] for _ in range(shard_count)]
+    for i, requirements in enumerate(packages.values()):
+        shards[i % shard_count].extend(requirements)
+    return [shard for shard in shards if shard]
+
+def pip_install_shard(shard):
+    """Install one shard of requirements without dependencies; returns stderr on failure"""
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", "install", "--no-deps", *shard],
+        capture_output=True, text=True, env=PIP_ENV
+    )
+    return result.stderr if result.returncode else None
+
+def find_uv():
+    """Return the path of the uv installer, installing it with pip if needed"""
+    uv = shutil.which("uv")
+    if uv:
+        return uv
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", "install", "uv"],
+        capture_output=True, text=True, env=PIP_ENV
+    )
+    if result.returncode != 0:
+        return None
+    # pip puts the uv binary next to the interpreter's scripts
+    return shutil.which("uv", path=os.pathsep.join([os.path.dirname(sys.executable), os.environ.get("PATH", "")]))
+
 def install_dependencies():
     """Install Python dependencies"""
     print("📦 Installing Python dependencies...")
     
     # Check if requirements_advanced.txt exists
-    if not Path("requirements_advanced.txt").exists():
+    if "requirements_advanced.txt" not in project_entries():
         print("❌ requirements_advanced.txt not found")
         return False
     
-    # Install dependencies
-    commands = [
-        ("pip install --upgrade pip", "Upgrading pip"),
-        ("pip install -r requirements_advanced.txt", "Installing advanced dependencies")
-    ]
+    # uv resolves, downloads and unpacks wheels in parallel on its own
+    uv = find_uv()
+    if uv:
+        print("🔧 Installing advanced dependencies with uv...")
+        result = subprocess.run([uv, "pip", "install", "--python", sys.executable, "-r", "requirements_advanced.txt"])
+        if result.returncode == 0:
+            print("✅ Installing advanced dependencies completed")
+            return True
+        print("⚠️  uv install failed, falling back to pip")
     
-    for command, description in commands:
-        if not run_command(command, description):
-            return False
+    # Fallback for offline or locked-down environments: plain pip
+    if not run_command([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], "Upgrading pip"):
+        return False
+    
+    # Fetch and install the pinned packages in parallel shards. Shards never
+    # share a package, so no two pip processes touch the same dist-info.
+    shards = read_requirement_shards("requirements_advanced.txt", PIP_INSTALL_WORKERS)
+    if shards:
+        print(f"🔧 Installing advanced dependencies in {len(shards)} parallel shards...")
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            errors = [error for error in executor.map(pip_install_shard, shards) if error]
+        if errors:
+            # Not fatal: the resolving pass below reinstalls whatever is missing
+            print(f"⚠️  {len(errors)} shard(s) failed, falling back to a serial install")
+    
+    # Serial pass resolves transitive dependencies the shards skipped; output streams live
+    print("🔧 Resolving remaining dependencies...")
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", "install", "-r", "requirements_advanced.txt"],
+        env=PIP_ENV
+    )
+    if result.returncode != 0:
+        print("❌ Installing advanced dependencies failed")
+        return False
+    print("✅ Installing advanced dependencies completed")
     
     return True
 
+def wait_for_http_ok(url, timeout, interval=0.25):
+    """Poll a URL until it answers 200; returns seconds waited, or None on timeout"""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.monotonic() - start
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(interval)
+    return None
+
 def setup_milvus():
     """Setup Milvus vector database"""
     print("🗄️  Setting up Milvus vector database...")
     
-    # Check if Docker is available
-    if not run_command("docker --version", "Checking Docker"):
+    # One docker call answers both "is Docker installed" and "is the container up"
+    try:
+        result = subprocess.run(
+            ["docker", "inspect", "--format", "{{.State.Running}}", "milvus-standalone"],
+            capture_output=True, text=True
+        )
+    except FileNotFoundError:
         print("❌ Docker is required for Milvus. Please install Docker first.")
         return False
     
-    # Check if Milvus container is already running
-    result = subprocess.run("docker ps --filter name=milvus-standalone --format '{{.Names}}'", 
-                          shell=True, capture_output=True, text=True)
+    state = result.stdout.strip() if result.returncode == 0 else None
     
-    if "milvus-standalone" in result.stdout:
+    if state == "true":
         print("✅ Milvus container already running")
         return True
     
+    if state == "false":
+        # The container exists but is stopped; docker run would fail on the name clash
+        if run_command(["docker", "start", "milvus-standalone"], "Starting existing Milvus container"):
+            return wait_for_milvus()
+        return False
+    
     # Start Milvus container
-    milvus_command = """
-    docker run -d \
-      --name milvus-standalone \
-      -p 19530:19530 -p 9091:9091 \
-      -v milvus_data:/var/lib/milvus \
-      milvusdb/milvus:latest standalone
-    """
-    
-    if run_command(milvus_command.strip(), "Starting Milvus container"):
-        print("⏳ Waiting for Milvus to start (30 seconds)...")
-        run_command("sleep 30", "Waiting for Milvus startup")
-        return True
+    milvus_command = [
+        "docker", "run", "-d",
+        "--name", "milvus-standalone",
+        "-p", "19530:19530", "-p", "9091:9091",
+        "--health-cmd", "curl -f http://localhost:9091/healthz",
+        "--health-interval", "2s",
+        "-v", "milvus_data:/var/lib/milvus",
+        "milvusdb/milvus:latest", "standalone",
+    ]
+    
+    if run_command(milvus_command, "Starting Milvus container"):
+        return wait_for_milvus()
     
     return False
 
+def wait_for_milvus():
+    """Wait for a freshly started Milvus container to pass its health check"""
+    print(f"⏳ Waiting for Milvus to become ready (up to {MILVUS_STARTUP_TIMEOUT} seconds)...")
+    elapsed = wait_for_http_ok(MILVUS_HEALTH_URL, MILVUS_STARTUP_TIMEOUT)
+    if elapsed is not None:
+        print(f"✅ Milvus ready after {elapsed:.1f}s")
+        return True
+    print(f"❌ Milvus not ready after {MILVUS_STARTUP_TIMEOUT} seconds, last log lines:")
+    subprocess.run(["docker", "logs", "milvus-standalone", "--tail", "50"])
+    return False
+
 def verify_api_keys():
     """Verify API keys are configured"""
     print("🔑 Verifying API keys...")
     
     env_file = Path(".env")
-    if not env_file.exists():
+    if env_file.name not in project_entries():
         print("❌ .env file not found")
         return False
     
-    env_content = env_file.read_text()
+    # Imported here because python-dotenv is only guaranteed to be present
+    # after install_dependencies() has run
+    from dotenv import dotenv_values
+    
+    env = dotenv_values(env_file)
     
     # Check for required API keys
     required_keys = {
@@ -127,7 +265,8 @@ def verify_api_keys():
     
     missing_keys = []
     for key, service in required_keys.items():
-        if f"{key}=" not in env_content or f"{key}=your_" in env_content:
+        value = env.get(key)
+        if not value or value.startswith("your_"):
             missing_keys.append(service)
         else:
             print(f"✅ {service} API key configured")
@@ -7,46 +7,52 @@ Creates database tables and runs initial migrations.
 import sys
 import os
 import argparse
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
 
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from app.core.config import settings
-from app.db.base import Base
-from app.db.session import engine
+# Driver, SQLAlchemy and application imports are deferred to the functions that
+# use them so that --help and argument errors return without loading settings
 
 
 def create_database():
     """Create the database if it doesn't exist."""
+    import psycopg2
+    from psycopg2 import sql
+    from sqlalchemy.engine import make_url
+    
+    from app.core.config import settings
+    
+    url = make_url(settings.DATABASE_URL)
+    db_name = url.database
+    
     try:
-        # Extract database name from URL
-        db_url_parts = settings.DATABASE_URL.split('/')
-        db_name = db_url_parts[-1]
-        base_url = '/'.join(db_url_parts[:-1])
-        
-        # Connect to PostgreSQL server (not specific database)
-        server_engine = create_engine(f"{base_url}/postgres")
-        
-        with server_engine.connect() as conn:
-            # Check if database exists
-            result = conn.execute(
-                text("SELECT 1 FROM pg_database WHERE datname = :db_name"),
-                {"db_name": db_name}
-            )
-            
-            if not result.fetchone():
-                # Create database
-                conn.execute(text("COMMIT"))  # End any existing transaction
-                conn.execute(text(f"CREATE DATABASE {db_name}"))
-                print(f"✓ Created database: {db_name}")
-            else:
-                print(f"✓ Database already exists: {db_name}")
+        # One autocommit connection to the maintenance database: CREATE DATABASE
+        # cannot run inside a transaction, and no engine or pool is needed
+        conn = psycopg2.connect(
+            host=url.host,
+            port=url.port,
+            user=url.username,
+            password=url.password,
+            dbname="postgres",
+            **url.query
+        )
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                # Check if database exists
+                cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (db_name,))
                 
-        server_engine.dispose()
+                if not cur.fetchone():
+                    # Create database
+                    cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(db_name)))
+                    print(f"✓ Created database: {db_name}")
+                else:
+                    print(f"✓ Database already exists: {db_name}")
+        finally:
+            conn.close()
         
-    except SQLAlchemyError as e:
+    except psycopg2.Error as e:
         print(f"✗ Error creating database: {e}")
         return False
     
@@ -55,6 +61,13 @@ def create_database():
 
 def create_tables(force=False):
     """Create all database tables."""
+    from sqlalchemy.exc import SQLAlchemyError
+    
+    # Importing every model and building the engine is slow; only pay for it
+    # when tables are actually created
+    from app.db.base import Base
+    from app.db.session import engine
+    
     try:
         if force:
             print("⚠️  Dropping all existing tables...")
@@ -76,19 +89,18 @@ def run_migrations():
     try:
         import subprocess
         
-        print("Running Alembic migrations...")
+        print("Running Alembic migrations...", flush=True)
+        # Alembic writes straight to this console so progress shows as it happens
         result = subprocess.run(
             ["alembic", "upgrade", "head"],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(__file__)
+            cwd=os.path.dirname(os.path.abspath(__file__))
         )
         
         if result.returncode == 0:
             print("✓ Migrations completed successfully")
             return True
         else:
-            print(f"✗ Migration failed: {result.stderr}")
+            print(f"✗ Migration failed with exit code {result.returncode} (see output above)")
             return False
             
     except Exception as e:
@@ -112,6 +124,8 @@ def main():
     
     args = parser.parse_args()
     
+    from app.core.config import settings
+    
     print("🚀 Setting up Doztra Research Backend database...")
     print(f"Database URL: {settings.DATABASE_URL}")
     
@@ -32,10 +32,8 @@ print('✅ Environment variables configured')
 
 # Test database connection
 try:
-    from sqlalchemy import create_engine
-    engine = create_engine(os.getenv('DATABASE_URL'))
-    with engine.connect() as conn:
-        conn.execute('SELECT 1')
+    from app.db.session import wait_for_database
+    wait_for_database()
     print('✅ Database connection successful')
 except Exception as e:
     print(f'❌ Database connection failed: {e}')
@@ -67,4 +65,4 @@ print('🎉 All critical services ready!')
 
 # Start the application
 echo "🌟 Starting FastAPI application..."
-exec uvicorn app.main:app --host 0.0.0.0 --port $PORT --workers 1
+exec uvicorn app.main:app --host 0.0.0.0 --port $PORT --workers 1 --loop uvloop --http httptools
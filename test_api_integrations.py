@@ -6,9 +6,40 @@ Tests AssemblyAI and Firecrawl API connections
 
 import os
 import asyncio
+import importlib.util
+import json
+from functools import lru_cache
+from pathlib import Path
+
 import aiohttp
+from aiohttp.resolver import AsyncResolver
 from dotenv import load_dotenv
 
+from script_output import buffered_output
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import aiodns  # noqa: F401 - backs aiohttp's AsyncResolver
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# sentence-transformers drags in torch and pymilvus drags in grpc, so only check
+# that they are installed here; each is imported once, by the check that needs it
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+PYMILVUS_AVAILABLE = importlib.util.find_spec("pymilvus") is not None
+
 # Load environment variables
 load_dotenv()
 
@@ -17,9 +48,40 @@ ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
 FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-async def test_assemblyai():
+# orjson parses and serializes in C; the stdlib json module is the fallback
+if ORJSON_AVAILABLE:
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+# ETag of the last YouTube probe response, kept between runs for conditional requests
+YOUTUBE_ETAG_FILE = Path.home() / ".cache" / "doztra" / "youtube_etag"
+
+def read_cached_etag(path):
+    """Return the ETag stored at path, or None if there is none"""
+    try:
+        return path.read_text().strip() or None
+    except OSError:
+        return None
+
+def write_cached_etag(path, etag):
+    """Store an ETag for the next run; caching is best effort"""
+    if not etag:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(etag)
+    except OSError:
+        pass
+
+@buffered_output
+async def test_assemblyai(session, emit):
     """Test AssemblyAI API connection"""
-    print("🎵 Testing AssemblyAI API...")
+    emit("🎵 Testing AssemblyAI API...")
     
     headers = {
         "authorization": ASSEMBLYAI_API_KEY,
@@ -33,33 +95,33 @@ async def test_assemblyai():
     }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Submit transcription job
-            async with session.post(
-                "https://api.assemblyai.com/v2/transcript",
-                headers=headers,
-                json=test_data
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    transcript_id = result.get("id")
-                    print(f"✅ AssemblyAI API connected successfully!")
-                    print(f"   Transcript ID: {transcript_id}")
-                    print(f"   Status: {result.get('status', 'unknown')}")
-                    return True
-                else:
-                    error_text = await response.text()
-                    print(f"❌ AssemblyAI API error: {response.status}")
-                    print(f"   Error: {error_text}")
-                    return False
+        # Submit transcription job
+        async with session.post(
+            "https://api.assemblyai.com/v2/transcript",
+            headers=headers,
+            data=json_dumps(test_data)
+        ) as response:
+            if response.status == 200:
+                result = await response.json(loads=json_loads)
+                transcript_id = result.get("id")
+                emit(f"✅ AssemblyAI API connected successfully!")
+                emit(f"   Transcript ID: {transcript_id}")
+                emit(f"   Status: {result.get('status', 'unknown')}")
+                return True
+            else:
+                error_text = await response.text()
+                emit(f"❌ AssemblyAI API error: {response.status}")
+                emit(f"   Error: {error_text}")
+                return False
                     
     except Exception as e:
-        print(f"❌ AssemblyAI connection failed: {e}")
+        emit(f"❌ AssemblyAI connection failed: {e}")
         return False
 
-async def test_firecrawl():
+@buffered_output
+async def test_firecrawl(session, emit):
     """Test Firecrawl API connection"""
-    print("\n🌐 Testing Firecrawl API...")
+    emit("\n🌐 Testing Firecrawl API...")
     
     headers = {
         "Authorization": f"Bearer {FIRECRAWL_API_KEY}",
@@ -74,33 +136,33 @@ async def test_firecrawl():
     }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://api.firecrawl.dev/v0/scrape",
-                headers=headers,
-                json=test_data
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    data = result.get("data", {})
-                    content_length = len(data.get("markdown", ""))
-                    print(f"✅ Firecrawl API connected successfully!")
-                    print(f"   Scraped content length: {content_length} characters")
-                    print(f"   Page title: {data.get('metadata', {}).get('title', 'N/A')}")
-                    return True
-                else:
-                    error_text = await response.text()
-                    print(f"❌ Firecrawl API error: {response.status}")
-                    print(f"   Error: {error_text}")
-                    return False
+        async with session.post(
+            "https://api.firecrawl.dev/v0/scrape",
+            headers=headers,
+            data=json_dumps(test_data)
+        ) as response:
+            if response.status == 200:
+                result = await response.json(loads=json_loads)
+                data = result.get("data", {})
+                content_length = len(data.get("markdown", ""))
+                emit(f"✅ Firecrawl API connected successfully!")
+                emit(f"   Scraped content length: {content_length} characters")
+                emit(f"   Page title: {data.get('metadata', {}).get('title', 'N/A')}")
+                return True
+            else:
+                error_text = await response.text()
+                emit(f"❌ Firecrawl API error: {response.status}")
+                emit(f"   Error: {error_text}")
+                return False
                     
     except Exception as e:
-        print(f"❌ Firecrawl connection failed: {e}")
+        emit(f"❌ Firecrawl connection failed: {e}")
         return False
 
-async def test_youtube_api():
+@buffered_output
+async def test_youtube_api(session, emit):
     """Test YouTube Data API connection"""
-    print("\n📺 Testing YouTube Data API...")
+    emit("\n📺 Testing YouTube Data API...")
     
     # Test with YouTube Data API v3
     test_url = f"https://www.googleapis.com/youtube/v3/videos"
@@ -110,44 +172,139 @@ async def test_youtube_api():
         "key": YOUTUBE_API_KEY
     }
     
+    # Revalidate against the ETag of the last successful run; Google checks the
+    # API key before answering 304, so an unchanged response still proves access
+    headers = {}
+    cached_etag = read_cached_etag(YOUTUBE_ETAG_FILE)
+    if cached_etag:
+        headers["If-None-Match"] = cached_etag
+    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(test_url, params=params) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    items = result.get("items", [])
-                    if items:
-                        video = items[0]
-                        snippet = video.get("snippet", {})
-                        stats = video.get("statistics", {})
-                        
-                        print(f"✅ YouTube API connected successfully!")
-                        print(f"   Video title: {snippet.get('title', 'N/A')}")
-                        print(f"   Channel: {snippet.get('channelTitle', 'N/A')}")
-                        print(f"   View count: {stats.get('viewCount', 'N/A')}")
-                        return True
-                    else:
-                        print("❌ YouTube API: No video data returned")
-                        return False
+        async with session.get(test_url, params=params, headers=headers) as response:
+            if response.status == 304:
+                emit(f"✅ YouTube API connected successfully!")
+                emit(f"   Video data unchanged since the last run (ETag {cached_etag})")
+                return True
+            elif response.status == 200:
+                result = await response.json(loads=json_loads)
+                items = result.get("items", [])
+                if items:
+                    video = items[0]
+                    snippet = video.get("snippet", {})
+                    stats = video.get("statistics", {})
+                    
+                    write_cached_etag(YOUTUBE_ETAG_FILE, response.headers.get("ETag"))
+                    emit(f"✅ YouTube API connected successfully!")
+                    emit(f"   Video title: {snippet.get('title', 'N/A')}")
+                    emit(f"   Channel: {snippet.get('channelTitle', 'N/A')}")
+                    emit(f"   View count: {stats.get('viewCount', 'N/A')}")
+                    return True
                 else:
-                    error_text = await response.text()
-                    print(f"❌ YouTube API error: {response.status}")
-                    print(f"   Error: {error_text}")
+                    emit("❌ YouTube API: No video data returned")
                     return False
+            else:
+                error_text = await response.text()
+                emit(f"❌ YouTube API error: {response.status}")
+                emit(f"   Error: {error_text}")
+                return False
                     
     except Exception as e:
-        print(f"❌ YouTube API connection failed: {e}")
+        emit(f"❌ YouTube API connection failed: {e}")
         return False
 
-async def test_vector_embeddings():
+# int8 ONNX export shipped with all-MiniLM-L6-v2, quantized for AVX-512 VNNI CPUs
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+# Statically int8-quantized OpenVINO export of the same model; EMBED_FAST=1 tries it
+# first when the check only needs to prove the pipeline works
+EMBEDDING_OPENVINO_FILE = "openvino/openvino_model_qint8_quantized.xml"
+EMBED_FAST = os.getenv("EMBED_FAST") == "1"
+
+@lru_cache(maxsize=1)
+def load_embedding_model():
+    """
+    Load the test embedding model on the fastest CPU backend available, once per process
+
+    Tries the quantized ONNX Runtime model first, then OpenVINO, then the
+    default PyTorch backend. With EMBED_FAST=1 the static int8 OpenVINO model
+    is tried before all of them. sentence-transformers releases before 3.2 do not
+    accept a backend argument and always end up on PyTorch.
+
+    Returns:
+        (model, backend name) tuple
+    """
+    from sentence_transformers import SentenceTransformer
+    
+    if EMBED_FAST:
+        try:
+            model = SentenceTransformer(
+                EMBEDDING_MODEL, backend="openvino", model_kwargs={"file_name": EMBEDDING_OPENVINO_FILE}
+            )
+            return model, "openvino (qint8 static)"
+        except Exception:
+            pass
+    
+    try:
+        model = SentenceTransformer(
+            EMBEDDING_MODEL, backend="onnx", model_kwargs={"file_name": EMBEDDING_ONNX_FILE}
+        )
+        return model, "onnx (qint8)"
+    except Exception:
+        pass
+    
+    try:
+        return SentenceTransformer(EMBEDDING_MODEL, backend="openvino"), "openvino"
+    except Exception:
+        pass
+    
+    return SentenceTransformer(EMBEDDING_MODEL), "torch"
+
+def encode_texts(model, texts):
+    """
+    Embed a list of texts in one encode call
+
+    SentenceTransformer.encode already sorts inputs by length before batching
+    and restores the original order, so padding stays tight without sorting here.
+
+    Args:
+        model: Loaded SentenceTransformer
+        texts: Texts to embed
+
+    Returns:
+        numpy array of shape (len(texts), dimension)
+    """
+    return model.encode(
+        texts,
+        batch_size=64,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=False
+    )
+
+def report_quantized_size(embeddings, emit):
+    """Print how much int8 quantization would shrink the given float32 embeddings"""
+    try:
+        from sentence_transformers.quantization import quantize_embeddings
+    except ImportError:
+        emit("   Int8 quantization: needs sentence-transformers >= 2.6")
+        return
+    
+    quantized = quantize_embeddings(embeddings, precision="int8")
+    emit(f"   Int8 quantization: {embeddings.nbytes} -> {quantized.nbytes} bytes")
+
+@buffered_output
+async def test_vector_embeddings(emit):
     """Test sentence-transformers for vector embeddings"""
-    print("\n🔍 Testing Vector Embeddings...")
+    emit("\n🔍 Testing Vector Embeddings...")
+    
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        emit("❌ sentence-transformers not installed")
+        emit("   Run: pip install 'sentence-transformers[onnx]'")
+        return False
     
     try:
-        from sentence_transformers import SentenceTransformer
-        
         # Load a lightweight model for testing
-        model = SentenceTransformer('all-MiniLM-L6-v2')
+        model, backend = load_embedding_model()
         
         # Test embedding generation
         test_texts = [
@@ -155,24 +312,32 @@ async def test_vector_embeddings():
             "Knowledge base content processing with AI."
         ]
         
-        embeddings = model.encode(test_texts)
-        print(f"✅ Vector embeddings working!")
-        print(f"   Model: all-MiniLM-L6-v2")
-        print(f"   Embedding dimension: {embeddings.shape[1]}")
-        print(f"   Test embeddings shape: {embeddings.shape}")
+        embeddings = encode_texts(model, test_texts)
+        emit(f"✅ Vector embeddings working!")
+        emit(f"   Model: {EMBEDDING_MODEL}")
+        emit(f"   Backend: {backend}")
+        emit(f"   Embedding dimension: {embeddings.shape[1]}")
+        emit(f"   Test embeddings shape: {embeddings.shape}")
+        report_quantized_size(embeddings, emit)
         return True
         
     except ImportError:
-        print("❌ sentence-transformers not installed")
-        print("   Run: pip install sentence-transformers")
+        emit("❌ sentence-transformers not installed")
+        emit("   Run: pip install 'sentence-transformers[onnx]'")
         return False
     except Exception as e:
-        print(f"❌ Vector embeddings failed: {e}")
+        emit(f"❌ Vector embeddings failed: {e}")
         return False
 
-def test_milvus_connection():
+@buffered_output
+def test_milvus_connection(emit):
     """Test Milvus vector database connection (local or Zilliz Cloud)"""
-    print("\n🗄️  Testing Milvus Connection...")
+    emit("\n🗄️  Testing Milvus Connection...")
+    
+    if not PYMILVUS_AVAILABLE:
+        emit("❌ pymilvus not installed")
+        emit("   Run: pip install pymilvus")
+        return False
     
     try:
         from pymilvus import connections, utility
@@ -196,50 +361,52 @@ def test_milvus_connection():
             connection_params["user"] = user
             connection_params["password"] = password
             
-        # Add secure connection for Zilliz Cloud
-        if use_secure:
-            connection_params["secure"] = True
+        # Always pass secure explicitly so local Milvus skips TLS negotiation
+        connection_params["secure"] = use_secure
         
-        # Try to connect
         connections.connect(**connection_params)
         
-        # Test connection
-        if connections.has_connection("default"):
-            connection_type = "Zilliz Cloud" if use_secure else "Local Milvus"
-            print(f"✅ {connection_type} connected successfully!")
-            print(f"   Host: {host}")
-            print(f"   Port: {port}")
-            if user:
-                print(f"   User: {user}")
-            print(f"   Secure: {use_secure}")
-            
-            # Test basic operations
-            try:
-                # List collections to verify we can perform operations
-                collections = utility.list_collections()
-                print(f"   Collections: {len(collections)} found")
-                return True
-            except Exception as e:
-                print(f"   ⚠️  Connected but operations failed: {e}")
-                return True  # Connection works, operations might need setup
-        else:
-            print("❌ Milvus connection failed")
-            return False
+        try:
+            # Test connection
+            if connections.has_connection("default"):
+                connection_type = "Zilliz Cloud" if use_secure else "Local Milvus"
+                emit(f"✅ {connection_type} connected successfully!")
+                emit(f"   Host: {host}")
+                emit(f"   Port: {port}")
+                if user:
+                    emit(f"   User: {user}")
+                emit(f"   Secure: {use_secure}")
+                
+                # Test basic operations
+                try:
+                    # List collections to verify we can perform operations
+                    collections = utility.list_collections()
+                    emit(f"   Collections: {len(collections)} found")
+                    return True
+                except Exception as e:
+                    emit(f"   ⚠️  Connected but operations failed: {e}")
+                    return True  # Connection works, operations might need setup
+            else:
+                emit("❌ Milvus connection failed")
+                return False
+        finally:
+            # Close the gRPC channel so repeated runs don't leak it
+            connections.disconnect("default")
             
     except ImportError:
-        print("❌ pymilvus not installed")
-        print("   Run: pip install pymilvus")
+        emit("❌ pymilvus not installed")
+        emit("   Run: pip install pymilvus")
         return False
     except Exception as e:
-        print(f"❌ Milvus connection failed: {e}")
+        emit(f"❌ Milvus connection failed: {e}")
         if use_secure:
-            print("   Check Zilliz Cloud credentials:")
-            print(f"   - Host: {host}")
-            print(f"   - User: {user}")
-            print("   - Password: [check if correct]")
+            emit("   Check Zilliz Cloud credentials:")
+            emit(f"   - Host: {host}")
+            emit(f"   - User: {user}")
+            emit("   - Password: [check if correct]")
         else:
-            print("   Make sure Milvus is running:")
-            print("   docker run -d --name milvus-standalone -p 19530:19530 -p 9091:9091 milvusdb/milvus:latest standalone")
+            emit("   Make sure Milvus is running:")
+            emit("   docker run -d --name milvus-standalone -p 19530:19530 -p 9091:9091 milvusdb/milvus:latest standalone")
         return False
 
 async def main():
@@ -249,12 +416,33 @@ async def main():
     
     results = []
     
-    # Test APIs
-    results.append(await test_assemblyai())
-    results.append(await test_firecrawl())
-    results.append(await test_youtube_api())
+    # pymilvus connects synchronously; run its handshake in a worker thread so it
+    # overlaps with the HTTP checks instead of blocking the event loop
+    milvus_task = asyncio.create_task(asyncio.to_thread(test_milvus_connection))
+    
+    # One pooled session for all HTTP checks, so DNS lookups and connections are
+    # reused; with aiodns, lookups are resolved on the event loop (c-ares) instead
+    # of in getaddrinfo worker threads
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=10,
+        keepalive_timeout=30,
+        use_dns_cache=True,
+        ttl_dns_cache=300,
+        resolver=AsyncResolver() if AIODNS_AVAILABLE else None
+    )
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # The HTTP checks are independent, so run them concurrently; each one
+        # prints its report in a single block when it finishes
+        api_results = await asyncio.gather(
+            test_assemblyai(session),
+            test_firecrawl(session),
+            test_youtube_api(session),
+            return_exceptions=True
+        )
+    results.extend(result is True for result in api_results)
     results.append(await test_vector_embeddings())
-    results.append(test_milvus_connection())
+    results.append(await milvus_task)
     
     # Summary
     print("\n" + "=" * 50)
@@ -285,9 +473,13 @@ async def main():
         print("   - Check YouTube API key in .env file")
         print("   - Ensure YouTube Data API v3 is enabled in Google Cloud Console")
     if not results[3]:  # Embeddings
-        print("   - Install: pip install sentence-transformers")
+        print("   - Install: pip install 'sentence-transformers[onnx]'")
     if not results[4]:  # Milvus
         print("   - Start Milvus: docker run -d --name milvus-standalone -p 19530:19530 milvusdb/milvus:latest standalone")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # libuv-backed loop where available (not on Windows); same loop the API server runs on
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
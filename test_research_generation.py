@@ -2,26 +2,96 @@
 Test script for research generation endpoints
 Run this after starting the server to verify all endpoints work correctly
 """
-import requests
+import asyncio
 import json
+import os
+import time
 from datetime import datetime
+from pathlib import Path
+
+import httpx
+from jose import JWTError, jwt
+
+from script_output import buffered_output
 
 # Configuration
 BASE_URL = "http://localhost:5000/api"
-# TODO: Replace with actual JWT token after authentication
+# Either paste a JWT here, or set DOZTRA_TEST_EMAIL and DOZTRA_TEST_PASSWORD to
+# log in; the token from a login is cached until shortly before it expires
 AUTH_TOKEN = "YOUR_JWT_TOKEN_HERE"
+TOKEN_CACHE_FILE = Path.home() / ".cache" / "doztra" / "test_token.json"
+TOKEN_EXPIRY_MARGIN = 60  # seconds
+
+# Generation endpoints call the LLM, so allow far more than httpx's 5 s default
+REQUEST_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
+def read_cached_token(path):
+    """Return the token cached at path for BASE_URL, or None if it is missing or about to expire"""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get("base_url") != BASE_URL or data.get("exp", 0) - time.time() <= TOKEN_EXPIRY_MARGIN:
+        return None
+    return data.get("token")
+
 
-headers = {
-    "Content-Type": "application/json",
-    "Authorization": f"Bearer {AUTH_TOKEN}"
-}
+def write_cached_token(path, token):
+    """Store a token and its expiry for the next run, readable by the owner only; caching is best effort"""
+    try:
+        exp = jwt.get_unverified_claims(token)["exp"]
+    except (JWTError, KeyError):
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"base_url": BASE_URL, "token": token, "exp": exp}, f)
+    except OSError:
+        pass
+
+
+async def get_auth_token(client):
+    """
+    Return the token to test with
+
+    Uses AUTH_TOKEN when it has been filled in, then a cached token, and only
+    logs in with DOZTRA_TEST_EMAIL/DOZTRA_TEST_PASSWORD when neither is usable.
+    """
+    if AUTH_TOKEN != "YOUR_JWT_TOKEN_HERE":
+        return AUTH_TOKEN
+    
+    token = read_cached_token(TOKEN_CACHE_FILE)
+    if token:
+        return token
+    
+    email = os.environ.get("DOZTRA_TEST_EMAIL")
+    password = os.environ.get("DOZTRA_TEST_PASSWORD")
+    if not (email and password):
+        return None
+    
+    try:
+        response = await client.post("/auth/login", data={"username": email, "password": password})
+    except httpx.HTTPError as e:
+        print(f"❌ Login error: {str(e)}")
+        return None
+    if response.status_code != 200:
+        print(f"❌ Login failed: {response.status_code} {response.text}")
+        return None
+    
+    token = response.json().get("access_token")
+    if token:
+        write_cached_token(TOKEN_CACHE_FILE, token)
+    return token
 
 
-def test_improve_topic():
+@buffered_output
+async def test_improve_topic(client, emit):
     """Test the improve-topic endpoint"""
-    print("\n" + "="*50)
-    print("Testing: POST /api/improve-topic")
-    print("="*50)
+    emit("\n" + "="*50)
+    emit("Testing: POST /api/improve-topic")
+    emit("="*50)
     
     payload = {
         "originalInput": "Digital marketing in Africa",
@@ -36,32 +106,32 @@ def test_improve_topic():
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/improve-topic",
-            headers=headers,
+        response = await client.post(
+            "/improve-topic",
             json=payload
         )
         
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 200:
-            print("✅ Test PASSED")
+            emit("✅ Test PASSED")
             return response.json()
         else:
-            print("❌ Test FAILED")
+            emit("❌ Test FAILED")
             return None
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
         return None
 
 
-def test_alternative_topic(previous_topic=None):
+@buffered_output
+async def test_alternative_topic(client, emit, previous_topic=None):
     """Test the alternative-topic endpoint"""
-    print("\n" + "="*50)
-    print("Testing: POST /api/alternative-topic")
-    print("="*50)
+    emit("\n" + "="*50)
+    emit("Testing: POST /api/alternative-topic")
+    emit("="*50)
     
     payload = {
         "originalInput": "Digital marketing in Africa",
@@ -74,32 +144,32 @@ def test_alternative_topic(previous_topic=None):
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/alternative-topic",
-            headers=headers,
+        response = await client.post(
+            "/alternative-topic",
             json=payload
         )
         
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 200:
-            print("✅ Test PASSED")
+            emit("✅ Test PASSED")
             return response.json()
         else:
-            print("❌ Test FAILED")
+            emit("❌ Test FAILED")
             return None
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
         return None
 
 
-def test_generate_outline():
+@buffered_output
+async def test_generate_outline(client, emit):
     """Test the generate-outline endpoint"""
-    print("\n" + "="*50)
-    print("Testing: POST /api/generate-outline")
-    print("="*50)
+    emit("\n" + "="*50)
+    emit("Testing: POST /api/generate-outline")
+    emit("="*50)
     
     payload = {
         "topic": "Digital Marketing Strategy for African Markets",
@@ -115,32 +185,32 @@ def test_generate_outline():
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/generate-outline",
-            headers=headers,
+        response = await client.post(
+            "/generate-outline",
             json=payload
         )
         
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 200:
-            print("✅ Test PASSED")
+            emit("✅ Test PASSED")
             return response.json()
         else:
-            print("❌ Test FAILED")
+            emit("❌ Test FAILED")
             return None
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
         return None
 
 
-def test_upload_documents():
+@buffered_output
+async def test_upload_documents(client, emit):
     """Test the upload-documents endpoint"""
-    print("\n" + "="*50)
-    print("Testing: POST /api/upload-documents")
-    print("="*50)
+    emit("\n" + "="*50)
+    emit("Testing: POST /api/upload-documents")
+    emit("="*50)
     
     # Create a test text file
     test_content = "This is a test document for research guidelines."
@@ -156,38 +226,34 @@ def test_upload_documents():
         })
     }
     
-    upload_headers = {
-        "Authorization": f"Bearer {AUTH_TOKEN}"
-    }
-    
     try:
-        response = requests.post(
-            f"{BASE_URL}/upload-documents",
-            headers=upload_headers,
+        response = await client.post(
+            "/upload-documents",
             files=files,
             data=data
         )
         
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 200:
-            print("✅ Test PASSED")
+            emit("✅ Test PASSED")
             return response.json()
         else:
-            print("❌ Test FAILED")
+            emit("❌ Test FAILED")
             return None
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
         return None
 
 
-def test_generate_draft():
+@buffered_output
+async def test_generate_draft(client, emit):
     """Test the generate-draft endpoint"""
-    print("\n" + "="*50)
-    print("Testing: POST /api/generate-draft")
-    print("="*50)
+    emit("\n" + "="*50)
+    emit("Testing: POST /api/generate-draft")
+    emit("="*50)
     
     payload = {
         "topic": "Digital Marketing Strategy for African Markets",
@@ -211,55 +277,64 @@ def test_generate_draft():
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/generate-draft",
-            headers=headers,
+        response = await client.post(
+            "/generate-draft",
             json=payload
         )
         
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        emit(f"Status Code: {response.status_code}")
+        emit(f"Response: {json.dumps(response.json(), indent=2)}")
         
         if response.status_code == 200:
-            print("✅ Test PASSED")
+            emit("✅ Test PASSED")
             return response.json()
         else:
-            print("❌ Test FAILED")
+            emit("❌ Test FAILED")
             return None
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        emit(f"❌ Error: {str(e)}")
         return None
 
 
-def run_all_tests():
-    """Run all tests in sequence"""
-    print("\n" + "🚀 "*25)
-    print("RESEARCH GENERATION API - TEST SUITE")
-    print("🚀 "*25)
-    
-    if AUTH_TOKEN == "YOUR_JWT_TOKEN_HERE":
-        print("\n⚠️  WARNING: Please update AUTH_TOKEN in the script")
-        print("Get a valid JWT token by logging in first")
-        return
-    
-    # Test 1: Improve Topic
-    improve_result = test_improve_topic()
+async def run_topic_tests(client):
+    """Improve a topic, then ask for an alternative to the improved one"""
+    improve_result = await test_improve_topic(client)
     
-    # Test 2: Alternative Topic
     previous_topic = None
     if improve_result and improve_result.get('improvedTopic'):
         previous_topic = improve_result['improvedTopic']
-    test_alternative_topic(previous_topic)
-    
-    # Test 3: Generate Outline
-    test_generate_outline()
-    
-    # Test 4: Upload Documents
-    test_upload_documents()
+    return await test_alternative_topic(client, previous_topic=previous_topic)
+
+
+async def run_all_tests():
+    """Run all tests, with the independent endpoints in parallel"""
+    print("\n" + "🚀 "*25)
+    print("RESEARCH GENERATION API - TEST SUITE")
+    print("🚀 "*25)
     
-    # Test 5: Generate Draft
-    test_generate_draft()
+    # One client for every request, so keep-alive connections to the API are
+    # reused; json= requests set their own Content-Type, multipart uploads theirs
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=REQUEST_TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(retries=2),
+    ) as client:
+        token = await get_auth_token(client)
+        if not token:
+            print("\n⚠️  WARNING: Please update AUTH_TOKEN in the script")
+            print("or set DOZTRA_TEST_EMAIL and DOZTRA_TEST_PASSWORD to log in")
+            return
+        client.headers["Authorization"] = f"Bearer {token}"
+        
+        # Only alternative-topic depends on another result (improve-topic), so
+        # that pair runs as a chain next to the other three endpoints
+        await asyncio.gather(
+            run_topic_tests(client),
+            test_generate_outline(client),
+            test_upload_documents(client),
+            test_generate_draft(client),
+        )
     
     print("\n" + "="*50)
     print("TEST SUITE COMPLETED")
@@ -274,8 +349,9 @@ if __name__ == "__main__":
     ║   Make sure the server is running:            ║
     ║   uvicorn app.main:app --reload --port 5000   ║
     ║                                                ║
-    ║   Update AUTH_TOKEN before running!           ║
+    ║   Set AUTH_TOKEN or DOZTRA_TEST_EMAIL and     ║
+    ║   DOZTRA_TEST_PASSWORD before running!        ║
     ╚════════════════════════════════════════════════╝
     """)
     
-    run_all_tests()
+    asyncio.run(run_all_tests())
@@ -13,6 +13,7 @@ load_dotenv()
 
 # Import our YouTube processor
 from app.services.youtube_processing import youtube_processor
+from script_output import buffered_output
 
 async def test_youtube_video_processing():
     """Test complete YouTube video processing"""
@@ -33,63 +34,65 @@ async def test_youtube_video_processing():
         }
     ]
     
-    for i, video in enumerate(test_videos, 1):
-        print(f"\n📺 Test {i}: {video['title']}")
-        print("-" * 40)
+    @buffered_output
+    async def process_video(i, video, emit):
+        emit(f"\n📺 Test {i}: {video['title']}")
+        emit("-" * 40)
         
         try:
             # Extract video ID
             video_id = youtube_processor.extract_video_id(video["url"])
-            print(f"✅ Video ID extracted: {video_id}")
+            emit(f"✅ Video ID extracted: {video_id}")
             
-            # Get metadata
-            print("📊 Getting video metadata...")
-            metadata = await youtube_processor.get_video_metadata(video_id)
+            # Metadata and transcript are independent fetches, so get them together
+            emit("📊 Getting video metadata and transcript...")
+            metadata, transcript = await asyncio.gather(
+                youtube_processor.get_video_metadata(video_id),
+                youtube_processor.get_video_transcript(video_id)
+            )
             
             if not metadata.get("error"):
-                print(f"✅ Metadata retrieved successfully")
-                print(f"   Title: {metadata.get('title', 'N/A')}")
-                print(f"   Channel: {metadata.get('channel_title', 'N/A')}")
-                print(f"   Duration: {metadata.get('duration', 'N/A')}")
-                print(f"   Views: {metadata.get('view_count', 'N/A'):,}")
-                print(f"   Published: {metadata.get('published_at', 'N/A')}")
+                emit(f"✅ Metadata retrieved successfully")
+                emit(f"   Title: {metadata.get('title', 'N/A')}")
+                emit(f"   Channel: {metadata.get('channel_title', 'N/A')}")
+                emit(f"   Duration: {metadata.get('duration', 'N/A')}")
+                emit(f"   Views: {metadata.get('view_count', 'N/A'):,}")
+                emit(f"   Published: {metadata.get('published_at', 'N/A')}")
             else:
-                print(f"❌ Metadata error: {metadata.get('error')}")
-            
-            # Get transcript
-            print("📝 Getting video transcript...")
-            transcript = await youtube_processor.get_video_transcript(video_id)
+                emit(f"❌ Metadata error: {metadata.get('error')}")
             
             if not transcript.get("error"):
-                print(f"✅ Transcript retrieved successfully")
-                print(f"   Language: {transcript.get('language', 'N/A')}")
-                print(f"   Generated: {transcript.get('is_generated', 'N/A')}")
-                print(f"   Word count: {transcript.get('word_count', 0):,}")
-                print(f"   Duration: {transcript.get('duration_seconds', 0):.1f} seconds")
+                emit(f"✅ Transcript retrieved successfully")
+                emit(f"   Language: {transcript.get('language', 'N/A')}")
+                emit(f"   Generated: {transcript.get('is_generated', 'N/A')}")
+                emit(f"   Word count: {transcript.get('word_count', 0):,}")
+                emit(f"   Duration: {transcript.get('duration_seconds', 0):.1f} seconds")
                 
                 # Show first 200 characters of transcript
                 full_text = transcript.get('full_transcript', '')
                 preview = full_text[:200] + "..." if len(full_text) > 200 else full_text
-                print(f"   Preview: {preview}")
+                emit(f"   Preview: {preview}")
             else:
-                print(f"❌ Transcript error: {transcript.get('error')}")
+                emit(f"❌ Transcript error: {transcript.get('error')}")
             
             # Test complete processing
-            print("🔄 Testing complete processing...")
+            emit("🔄 Testing complete processing...")
             result = await youtube_processor.process_youtube_video(video["url"])
             
             if not result.get("error"):
-                print(f"✅ Complete processing successful")
-                print(f"   Content length: {result.get('content_length', 0):,} characters")
-                print(f"   Word count: {result.get('word_count', 0):,}")
-                print(f"   Processing status: {result.get('processing_status', 'unknown')}")
+                emit(f"✅ Complete processing successful")
+                emit(f"   Content length: {result.get('content_length', 0):,} characters")
+                emit(f"   Word count: {result.get('word_count', 0):,}")
+                emit(f"   Processing status: {result.get('processing_status', 'unknown')}")
             else:
-                print(f"❌ Processing error: {result.get('error')}")
+                emit(f"❌ Processing error: {result.get('error')}")
                 
         except Exception as e:
-            print(f"❌ Test failed: {e}")
-        
-        print()
+            emit(f"❌ Test failed: {e}")
+        emit("")
+    
+    # The videos are independent too, so process them all at once
+    await asyncio.gather(*(process_video(i, video) for i, video in enumerate(test_videos, 1)))
 
 async def test_youtube_search():
     """Test YouTube search functionality"""
@@ -85,10 +85,12 @@ def test_zilliz_connection():
             
             # Create index
             print("🔍 Creating vector index...")
+            # HNSW graph search instead of scanning IVF buckets; COSINE matches
+            # the metric the app's vector search uses
             index_params = {
-                "metric_type": "L2",
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 128}
+                "metric_type": "COSINE",
+                "index_type": "HNSW",
+                "params": {"M": 16, "efConstruction": 200}
             }
             collection.create_index("embedding", index_params)
             print("✅ Vector index created successfully!")
@@ -97,10 +99,14 @@ def test_zilliz_connection():
             print("📝 Testing data insertion...")
             import numpy as np
             
+            # Embeddings go in as one contiguous float32 array instead of
+            # per-row Python lists, which pymilvus would have to walk float by float
+            num_rows = 2
+            rng = np.random.default_rng(0)
             test_data = [
-                ["test_content_1", "test_content_2"],  # content_id
-                [np.random.random(768).tolist(), np.random.random(768).tolist()],  # embedding
-                ["This is test content 1", "This is test content 2"]  # text
+                [f"test_content_{i + 1}" for i in range(num_rows)],  # content_id
+                rng.random((num_rows, 768), dtype=np.float32),  # embedding
+                [f"This is test content {i + 1}" for i in range(num_rows)]  # text
             ]
             
             insert_result = collection.insert(test_data)
@@ -112,8 +118,8 @@ def test_zilliz_connection():
             
             # Test search
             print("🔍 Testing vector search...")
-            search_vectors = [np.random.random(768).tolist()]
-            search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
+            search_vectors = rng.random((1, 768), dtype=np.float32)
+            search_params = {"metric_type": "COSINE", "params": {"ef": 64}}
             
             results = collection.search(
                 search_vectors,
@@ -125,7 +131,7 @@ def test_zilliz_connection():
             
             print(f"✅ Search completed! Found {len(results[0])} results")
             for i, result in enumerate(results[0]):
-                print(f"   Result {i+1}: {result.entity.get('text')} (distance: {result.distance:.4f})")
+                print(f"   Result {i+1}: {result.entity.get('text')} (similarity: {result.distance:.4f})")
             
             # Clean up test collection
             print("🧹 Cleaning up test collection...")
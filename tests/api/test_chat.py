@@ -135,6 +135,18 @@ def test_delete_conversation(client: TestClient, test_user: User, test_conversat
     assert response.status_code == 404
 
 
+def test_malformed_conversation_id_returns_404(client: TestClient, test_user: User):
+    """Test that a conversation id that is not a UUID is treated as not found."""
+    token = get_test_token(test_user)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    response = client.get("/api/chat/conversations/not-a-uuid/messages", headers=headers)
+    assert response.status_code == 404
+    
+    response = client.delete("/api/chat/conversations/not-a-uuid", headers=headers)
+    assert response.status_code == 404
+
+
 def test_create_conversation(client: TestClient, test_user: User):
     """Test creating a new conversation."""
     token = get_test_token(test_user)
@@ -3,55 +3,28 @@ Tests for the Document API endpoints.
 """
 
 import pytest
-import os
-import tempfile
+import io
 import json
 from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 import uuid
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 from app.main import app
 from app.models.user import User
 from tests.utils.auth import get_test_token
 
 
+TXT_BODY = b"This is a test document.\nIt contains multiple lines.\nFor testing purposes."
+
+
 @pytest.fixture
 def test_document_id():
     """Generate a test document ID."""
     return f"doc-{uuid.uuid4()}"
 
 
-@pytest.fixture
-def test_pdf_file():
-    """Create a temporary PDF file for testing."""
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-        # Write some dummy content to make it look like a PDF
-        temp_file.write(b"%PDF-1.5\nTest PDF content\n%%EOF")
-        temp_file_path = temp_file.name
-    
-    yield temp_file_path
-    
-    # Clean up the temporary file
-    if os.path.exists(temp_file_path):
-        os.unlink(temp_file_path)
-
-
-@pytest.fixture
-def test_text_file():
-    """Create a temporary text file for testing."""
-    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as temp_file:
-        temp_file.write(b"This is a test document.\nIt contains multiple lines.\nFor testing purposes.")
-        temp_file_path = temp_file.name
-    
-    yield temp_file_path
-    
-    # Clean up the temporary file
-    if os.path.exists(temp_file_path):
-        os.unlink(temp_file_path)
-
-
 @pytest.fixture
 def mock_document_chunks(test_document_id):
     """Create mock document chunks for testing."""
@@ -85,28 +58,25 @@ def mock_document_chunks(test_document_id):
     ]
     
     # Write chunks to file
-    with open(chunks_file, "w") as f:
-        json.dump(chunks, f)
+    chunks_file.write_text(json.dumps(chunks))
     
     yield test_document_id
     
     # Clean up
-    if chunks_file.exists():
-        chunks_file.unlink()
+    chunks_file.unlink(missing_ok=True)
 
 
-def test_upload_document(client: TestClient, test_user: User, test_text_file: str, user_headers):
+def test_upload_document(client: TestClient, test_user: User, user_headers):
     """Test uploading a document."""
     
     # Mock the background processing task
     with patch('app.api.routes.documents.process_document_background'):
-        with open(test_text_file, "rb") as file:
-            response = client.post(
-                "/api/documents/upload",
-                headers=user_headers,
-                files={"file": ("test.txt", file, "text/plain")},
-                data={"metadata": json.dumps({"source": "test"})}
-            )
+        response = client.post(
+            "/api/documents/upload",
+            headers=user_headers,
+            files={"file": ("test.txt", io.BytesIO(TXT_BODY), "text/plain")},
+            data={"metadata": json.dumps({"source": "test"})}
+        )
         
         assert response.status_code == 200
         data = response.json()
@@ -116,6 +86,63 @@ def test_upload_document(client: TestClient, test_user: User, test_text_file: st
         assert data["status"] == "uploaded"
 
 
+def test_upload_duplicate_document_reuses_chunks(client: TestClient, test_user: User, user_headers):
+    """Test that re-uploading identical content reuses the processed chunks."""
+    
+    with patch('app.api.routes.documents.process_document_background') as mock_background, \
+            patch('app.services.document_status.find_document_by_content_hash', new_callable=AsyncMock, return_value="doc-original"), \
+            patch('app.services.document_status.update_document_status', new_callable=AsyncMock) as mock_status, \
+            patch('app.services.document_status.record_content_hash', new_callable=AsyncMock) as mock_record, \
+            patch('app.services.openai_service.clone_document_chunks', new_callable=AsyncMock) as mock_clone:
+        response = client.post(
+            "/api/documents/upload",
+            headers=user_headers,
+            files={"file": ("test.txt", io.BytesIO(TXT_BODY), "text/plain")}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert mock_clone.await_args.args[0] == "doc-original"
+        mock_status.assert_awaited_once_with(data["document_id"], str(test_user.id), "ready")
+        mock_record.assert_awaited_once()
+        mock_background.assert_not_called()
+
+
+def test_upload_duplicate_document_with_missing_chunks(client: TestClient, test_user: User, user_headers):
+    """Test that a duplicate whose source chunks are gone is processed normally."""
+    
+    with patch('app.api.routes.documents.process_document_background') as mock_background, \
+            patch('app.services.document_status.find_document_by_content_hash', new_callable=AsyncMock, return_value="doc-original"), \
+            patch('app.services.document_status.update_document_status', new_callable=AsyncMock) as mock_status, \
+            patch('app.services.openai_service.clone_document_chunks', new_callable=AsyncMock, side_effect=FileNotFoundError):
+        response = client.post(
+            "/api/documents/upload",
+            headers=user_headers,
+            files={"file": ("test.txt", io.BytesIO(TXT_BODY), "text/plain")}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "uploaded"
+        mock_status.assert_awaited_once_with(data["document_id"], str(test_user.id), "uploaded")
+        mock_background.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_process_document_background_marks_failed():
+    """Test that a processing error leaves the document in the failed status."""
+    from app.api.routes.documents import process_document_background
+    
+    with patch('app.services.document_status.update_document_status', new_callable=AsyncMock) as mock_status, \
+            patch('app.services.document_status.record_content_hash', new_callable=AsyncMock) as mock_record, \
+            patch('app.services.openai_service.process_document', new_callable=AsyncMock, side_effect=RuntimeError("boom")):
+        await process_document_background("missing.txt", "text/plain", "doc-1", "user-1", {}, "abc123")
+    
+    assert [call.args[2] for call in mock_status.await_args_list] == ["processing", "failed"]
+    mock_record.assert_not_awaited()
+
+
 def test_get_document(client: TestClient, test_user: User, mock_document_chunks, user_headers):
     """Test getting document metadata."""
     document_id = mock_document_chunks
@@ -129,8 +156,7 @@ def test_get_document(client: TestClient, test_user: User, mock_document_chunks,
     
     # Create a dummy file
     test_file = doc_dir / "test.txt"
-    with open(test_file, "w") as f:
-        f.write("Test content")
+    test_file.write_text("Test content")
     
     try:
         response = client.get(
@@ -146,8 +172,7 @@ def test_get_document(client: TestClient, test_user: User, mock_document_chunks,
     
     finally:
         # Clean up
-        if test_file.exists():
-            test_file.unlink()
+        test_file.unlink(missing_ok=True)
         if doc_dir.exists():
             doc_dir.rmdir()
         if user_dir.exists():
@@ -167,8 +192,7 @@ def test_list_documents(client: TestClient, test_user: User, mock_document_chunk
     
     # Create a dummy file
     test_file = doc_dir / "test.txt"
-    with open(test_file, "w") as f:
-        f.write("Test content")
+    test_file.write_text("Test content")
     
     try:
         response = client.get(
@@ -184,8 +208,7 @@ def test_list_documents(client: TestClient, test_user: User, mock_document_chunk
     
     finally:
         # Clean up
-        if test_file.exists():
-            test_file.unlink()
+        test_file.unlink(missing_ok=True)
         if doc_dir.exists():
             doc_dir.rmdir()
         if user_dir.exists():
@@ -205,8 +228,7 @@ def test_delete_document(client: TestClient, test_user: User, mock_document_chun
     
     # Create a dummy file
     test_file = doc_dir / "test.txt"
-    with open(test_file, "w") as f:
-        f.write("Test content")
+    test_file.write_text("Test content")
     
     try:
         response = client.delete(
@@ -227,8 +249,7 @@ def test_delete_document(client: TestClient, test_user: User, mock_document_chun
     
     finally:
         # Clean up if test fails
-        if test_file.exists():
-            test_file.unlink()
+        test_file.unlink(missing_ok=True)
         if doc_dir.exists():
             doc_dir.rmdir()
         if user_dir.exists():
@@ -18,6 +18,8 @@ import json
 import requests
 import time
 import sys
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
@@ -26,6 +28,13 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 8000
 BASE_URL = ""  # Will be set based on host and port
 
+# One session for every request, so keep-alive connections to the API are reused;
+# idempotent requests are retried on connection errors with a short backoff
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 # Test user data
 TEST_USER = {
     "name": "Test User",
@@ -99,13 +108,13 @@ def make_request(
     # Make the request
     try:
         if method.upper() == "GET":
-            response = requests.get(url, headers=headers)
+            response = SESSION.get(url, headers=headers)
         elif method.upper() == "POST":
-            response = requests.post(url, json=data, headers=headers)
+            response = SESSION.post(url, json=data, headers=headers)
         elif method.upper() == "PUT":
-            response = requests.put(url, json=data, headers=headers)
+            response = SESSION.put(url, json=data, headers=headers)
         elif method.upper() == "DELETE":
-            response = requests.delete(url, headers=headers)
+            response = SESSION.delete(url, headers=headers)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
@@ -177,7 +186,7 @@ def test_user_login() -> Tuple[bool, Optional[Dict[str, Any]]]:
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             url,
             data=login_data,  # Send as form data
             headers=headers
@@ -361,7 +370,10 @@ def main() -> None:
     BASE_URL = f"http://{args.host}:{args.port}"
     
     # Run tests
-    run_tests()
+    try:
+        run_tests()
+    finally:
+        SESSION.close()
 
 
 if __name__ == "__main__":
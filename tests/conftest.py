@@ -19,8 +19,10 @@ from app.models.user_preferences import UserPreferences
 from app.models.usage_statistics import UsageStatistics
 from app.services.auth import create_access_token, get_password_hash
 
-# Use an in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Use a SQLite database file for testing; each pytest-xdist worker gets its own
+# file so parallel runs (pytest -n auto) do not drop each other's tables
+_XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///./test_{_XDIST_WORKER}.db" if _XDIST_WORKER else "sqlite:///./test.db"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
@@ -12,6 +12,12 @@ NC='\033[0m' # No Color
 echo -e "${YELLOW}=== DOCUMENT API INTEGRATION TEST ===${NC}"
 echo ""
 
+# Responses are parsed with jq
+if ! command -v jq > /dev/null 2>&1; then
+  echo -e "${RED}jq is required to run this test${NC}"
+  exit 1
+fi
+
 # Wait for deployment to be ready
 echo "Waiting for deployment to complete (5 seconds)..."
 sleep 5
@@ -23,7 +29,7 @@ AUTH_RESPONSE=$(curl -s -X POST "http://localhost:8000/api/auth/login" \
   -d '{"email":"test@example.com","password":"password123"}')
 
 # Extract token from response
-ACCESS_TOKEN=$(echo $AUTH_RESPONSE | grep -o '"access_token":"[^"]*' | cut -d'"' -f4)
+ACCESS_TOKEN=$(echo "$AUTH_RESPONSE" | jq -r '.access_token // empty' 2>/dev/null)
 
 if [ -z "$ACCESS_TOKEN" ]; then
   echo -e "${RED}Failed to get authentication token${NC}"
@@ -42,7 +48,7 @@ UPLOAD_RESPONSE=$(curl -s -X POST "http://localhost:8000/api/v2/documents/upload
   -F "file=@./tests/test_files/sample.pdf")
 
 # Extract document ID from response
-DOCUMENT_ID=$(echo $UPLOAD_RESPONSE | grep -o '"document_id":"[^"]*' | cut -d'"' -f4)
+DOCUMENT_ID=$(echo "$UPLOAD_RESPONSE" | jq -r '.document_id // empty' 2>/dev/null)
 
 if [ -z "$DOCUMENT_ID" ]; then
   echo -e "${RED}Failed to upload document${NC}"
@@ -58,18 +64,22 @@ echo ""
 # Step 3: Wait for document processing to complete
 echo -e "${YELLOW}3. Waiting for document processing...${NC}"
 STATUS="pending"
-MAX_ATTEMPTS=20
-ATTEMPT=1
-
-while [ "$STATUS" = "pending" ] && [ $ATTEMPT -le $MAX_ATTEMPTS ]; do
-  echo "Checking document status (attempt $ATTEMPT/$MAX_ATTEMPTS)..."
+# Poll quickly at first and back off exponentially (100 ms doubling up to 5 s),
+# giving up after 40 seconds
+TIMEOUT_SECONDS=40
+DELAY_MS=100
+MAX_DELAY_MS=5000
+DEADLINE=$((SECONDS + TIMEOUT_SECONDS))
+
+while [ "$STATUS" = "pending" ] && [ $SECONDS -lt $DEADLINE ]; do
+  echo "Checking document status ($((DEADLINE - SECONDS))s left)..."
   
   # Get document details
   DOCUMENT_RESPONSE=$(curl -s -X GET "http://localhost:8000/api/v2/documents/$DOCUMENT_ID" \
     -H "Authorization: Bearer $ACCESS_TOKEN")
   
   # Extract status from response
-  STATUS=$(echo $DOCUMENT_RESPONSE | grep -o '"status":"[^"]*' | cut -d'"' -f4)
+  STATUS=$(echo "$DOCUMENT_RESPONSE" | jq -r '.status // empty' 2>/dev/null)
   
   if [ "$STATUS" = "completed" ]; then
     echo -e "${GREEN}Document processing completed${NC}"
@@ -80,9 +90,13 @@ while [ "$STATUS" = "pending" ] && [ $ATTEMPT -le $MAX_ATTEMPTS ]; do
     echo $DOCUMENT_RESPONSE
     exit 1
   else
-    echo "Status: $STATUS. Waiting 2 seconds..."
-    sleep 2
-    ATTEMPT=$((ATTEMPT + 1))
+    DELAY=$(printf '%d.%03d' $((DELAY_MS / 1000)) $((DELAY_MS % 1000)))
+    echo "Status: $STATUS. Waiting ${DELAY} seconds..."
+    sleep "$DELAY"
+    DELAY_MS=$((DELAY_MS * 2))
+    if [ $DELAY_MS -gt $MAX_DELAY_MS ]; then
+      DELAY_MS=$MAX_DELAY_MS
+    fi
   fi
 done
 
@@ -0,0 +1,66 @@
+"""
+Unit tests for the document status and content hash store.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services import document_status
+
+
+@pytest.fixture(autouse=True)
+def status_db(tmp_path, monkeypatch):
+    """Point the status store at a fresh database for every test."""
+    monkeypatch.setattr(settings, "DOCUMENT_STATUS_DB", str(tmp_path / "doc_status.db"))
+    monkeypatch.setattr(document_status, "_connection", None)
+    yield
+    if document_status._connection is not None:
+        document_status._connection.close()
+
+
+@pytest.mark.asyncio
+async def test_status_transitions():
+    """Test that a document moves from uploaded to failed and the latest status wins."""
+    assert await document_status.get_document_status("doc-1") is None
+    
+    await document_status.update_document_status("doc-1", "user-1", "uploaded")
+    assert await document_status.get_document_status("doc-1") == "uploaded"
+    
+    await document_status.update_document_status("doc-1", "user-1", "processing")
+    await document_status.update_document_status("doc-1", "user-1", "failed")
+    assert await document_status.get_document_status("doc-1") == "failed"
+
+
+@pytest.mark.asyncio
+async def test_get_user_document_statuses():
+    """Test that listing statuses only returns the user's own documents."""
+    await document_status.update_document_status("doc-1", "user-1", "uploaded")
+    await document_status.update_document_status("doc-2", "user-1", "ready")
+    await document_status.update_document_status("doc-3", "user-2", "ready")
+    
+    assert await document_status.get_user_document_statuses("user-1") == {
+        "doc-1": "uploaded",
+        "doc-2": "ready"
+    }
+
+
+@pytest.mark.asyncio
+async def test_content_hash_is_scoped_to_user():
+    """Test that identical content is only matched against the same user's documents."""
+    await document_status.record_content_hash("user-1", "abc123", "doc-1")
+    
+    assert await document_status.find_document_by_content_hash("user-1", "abc123") == "doc-1"
+    assert await document_status.find_document_by_content_hash("user-2", "abc123") is None
+    assert await document_status.find_document_by_content_hash("user-1", "def456") is None
+
+
+@pytest.mark.asyncio
+async def test_delete_document_status_forgets_content_hash():
+    """Test that deleting a document removes its status and its content hash."""
+    await document_status.update_document_status("doc-1", "user-1", "ready")
+    await document_status.record_content_hash("user-1", "abc123", "doc-1")
+    
+    await document_status.delete_document_status("doc-1")
+    
+    assert await document_status.get_document_status("doc-1") is None
+    assert await document_status.find_document_by_content_hash("user-1", "abc123") is None
@@ -3,11 +3,15 @@ Unit tests for the OpenAI service document processing functions.
 """
 
 import pytest
-import os
 import tempfile
 import json
 from pathlib import Path
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import httpx
+import numpy as np
+from openai import BadRequestError
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from app.services import openai_service
@@ -29,8 +33,7 @@ def test_text_file():
     yield temp_file_path
     
     # Clean up the temporary file
-    if os.path.exists(temp_file_path):
-        os.unlink(temp_file_path)
+    Path(temp_file_path).unlink(missing_ok=True)
 
 
 @pytest.fixture
@@ -44,8 +47,7 @@ def test_pdf_file():
     yield temp_file_path
     
     # Clean up the temporary file
-    if os.path.exists(temp_file_path):
-        os.unlink(temp_file_path)
+    Path(temp_file_path).unlink(missing_ok=True)
 
 
 @pytest.fixture
@@ -59,8 +61,7 @@ def test_image_file():
     yield temp_file_path
     
     # Clean up the temporary file
-    if os.path.exists(temp_file_path):
-        os.unlink(temp_file_path)
+    Path(temp_file_path).unlink(missing_ok=True)
 
 
 @pytest.mark.asyncio
@@ -74,15 +75,32 @@ async def test_extract_text_from_document_txt(test_text_file):
 @pytest.mark.asyncio
 async def test_extract_text_from_document_pdf(test_pdf_file):
     """Test extracting text from a PDF file."""
-    # Mock PyPDF2.PdfReader to avoid actual PDF parsing
-    with patch('PyPDF2.PdfReader') as mock_pdf_reader:
-        # Setup the mock
-        mock_page = MagicMock()
-        mock_page.extract_text.return_value = "Mocked PDF content"
-        mock_pdf_reader.return_value.pages = [mock_page]
+    # Extraction normally runs in spawned worker processes that patches cannot
+    # reach, so run it in-process and mock the PDF parser
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with patch('app.services.openai_service._get_extraction_pool', return_value=pool):
+            with patch('app.utils.text_extraction._extract_pdf_text', return_value="Mocked PDF content") as mock_extract_pdf:
+                result = await openai_service.extract_text_from_document(test_pdf_file, "application/pdf")
+    
+    assert "Mocked PDF content" in result
+    mock_extract_pdf.assert_called_once_with(test_pdf_file)
+
+
+@pytest.mark.asyncio
+async def test_extract_text_from_document_broken_pool(test_pdf_file):
+    """Test that a crashed extraction pool is replaced for the next document."""
+    broken_pool = MagicMock()
+    openai_service._extraction_pool = broken_pool
+    try:
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, 'run_in_executor', side_effect=BrokenProcessPool()):
+            with pytest.raises(Exception, match="Failed to extract text"):
+                await openai_service.extract_text_from_document(test_pdf_file, "application/pdf")
         
-        result = await openai_service.extract_text_from_document(test_pdf_file, "application/pdf")
-        assert "Mocked PDF content" in result
+        assert openai_service._extraction_pool is None
+        broken_pool.shutdown.assert_called_once()
+    finally:
+        openai_service._extraction_pool = None
 
 
 @pytest.mark.asyncio
@@ -111,15 +129,77 @@ async def test_chunk_document():
     # Temporarily patch MAX_CHUNK_SIZE to force chunking
     with patch('app.services.openai_service.MAX_CHUNK_SIZE', 500):
         # Chunk the document
-        chunks = await openai_service.chunk_document(long_text, metadata)
+        texts, metadatas = await openai_service.chunk_document(long_text, metadata)
     
     # Verify chunks
-    assert len(chunks) > 1
-    assert all("text" in chunk for chunk in chunks)
-    assert all("metadata" in chunk for chunk in chunks)
-    assert all(chunk["metadata"]["document_id"] == "test-doc" for chunk in chunks)
-    assert all(chunk["metadata"]["source"] == "test" for chunk in chunks)
-    assert all(chunk["metadata"]["chunk_index"] >= 0 for chunk in chunks)
+    assert len(texts) > 1
+    assert len(metadatas) == len(texts)
+    assert all(len(text) <= 500 for text in texts)
+    assert all(chunk_metadata["document_id"] == "test-doc" for chunk_metadata in metadatas)
+    assert all(chunk_metadata["source"] == "test" for chunk_metadata in metadatas)
+    assert [chunk_metadata["chunk_index"] for chunk_metadata in metadatas] == list(range(len(texts)))
+
+
+@pytest.mark.asyncio
+async def test_chunk_document_splits_oversized_paragraph():
+    """Test that a paragraph longer than the chunk size is split at spaces."""
+    # A plain text file without blank lines is a single paragraph
+    text = " ".join(f"word{i}" for i in range(500))
+    
+    texts, metadatas = await openai_service.chunk_document(text, chunk_size=500)
+    
+    assert len(texts) > 1
+    assert all(len(chunk) <= 500 for chunk in texts)
+    assert " ".join(texts) == text
+
+
+def test_adaptive_chunk_size_stays_within_max_chunk_size():
+    """Test that the token-based chunk size never exceeds MAX_CHUNK_SIZE characters."""
+    assert openai_service._get_adaptive_chunk_size("Short English text.") <= openai_service.MAX_CHUNK_SIZE
+    assert openai_service._get_adaptive_chunk_size("") == openai_service.MAX_CHUNK_SIZE
+
+
+def _bad_request(message="This model's maximum context length is 8192 tokens", code="context_length_exceeded"):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return BadRequestError(message, response=httpx.Response(400, request=request), body={"message": message, "code": code})
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_does_not_split_other_bad_requests():
+    """Test that a 400 that is not a size rejection fails at once instead of being split."""
+    with patch('app.services.openai_service.client.embeddings.create',
+               side_effect=_bad_request("The model does not exist", code="model_not_found")) as mock_openai:
+        with pytest.raises(BadRequestError):
+            await openai_service.generate_embeddings(["first", "second", "third", "fourth"], rejected=[])
+    
+    mock_openai.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_embed_chunks_rechunks_only_rejected_chunks():
+    """Test that only the chunks the embeddings API rejects are split and embedded again."""
+    embedded = []
+    
+    async def create(model, input):
+        if any(len(text) > 600 for text in input):
+            raise _bad_request()
+        embedded.extend(input)
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[0.1] * 1536) for _ in input]
+        return response
+    
+    short_chunk = "A short chunk."
+    long_chunk = " ".join(f"word{i}" for i in range(150))
+    
+    with patch('app.services.openai_service.client.embeddings.create', side_effect=create):
+        texts, embeddings = await openai_service._embed_chunks([short_chunk, long_chunk], 1000)
+    
+    assert texts[0] == short_chunk
+    assert len(texts) > 2
+    assert all(len(text) <= 600 for text in texts)
+    assert embeddings.shape == (len(texts), 1536)
+    # The accepted chunk was embedded once and not re-sent with the re-chunked pieces
+    assert embedded.count(short_chunk) == 1
 
 
 @pytest.mark.asyncio
@@ -155,15 +235,15 @@ async def test_process_document(test_text_file, test_document_id):
     # Create mocks for all the functions called by process_document
     with patch('app.services.openai_service.extract_text_from_document', return_value="Test document content") as mock_extract:
         with patch('app.services.openai_service.chunk_document') as mock_chunk:
-            # Setup chunk mock to return two chunks
-            mock_chunk.return_value = [
-                {"text": "Chunk 1", "metadata": {"chunk_index": 0}},
-                {"text": "Chunk 2", "metadata": {"chunk_index": 1}}
-            ]
+            # Setup chunk mock to return two chunks as parallel texts and metadata
+            chunk_texts = ["Chunk 1", "Chunk 2"]
+            chunk_metadatas = [{"chunk_index": 0}, {"chunk_index": 1}]
+            mock_chunk.return_value = (chunk_texts, chunk_metadatas)
             
-            with patch('app.services.openai_service.generate_embeddings') as mock_embeddings:
+            with patch.object(openai_service.embedding_batcher, 'embed', new_callable=AsyncMock) as mock_embed:
                 # Setup embeddings mock
-                mock_embeddings.return_value = [[0.1] * 1536, [0.2] * 1536]
+                embeddings = np.array([[0.1] * 1536, [0.2] * 1536], dtype=np.float16)
+                mock_embed.return_value = embeddings
                 
                 with patch('app.services.openai_service.store_document_chunks', return_value=True) as mock_store:
                     # Call the function
@@ -183,8 +263,10 @@ async def test_process_document(test_text_file, test_document_id):
                     # Verify the function calls
                     mock_extract.assert_called_once_with(test_text_file, "text/plain")
                     mock_chunk.assert_called_once()
-                    mock_embeddings.assert_called_once_with(["Chunk 1", "Chunk 2"])
-                    mock_store.assert_called_once()
+                    mock_embed.assert_awaited_once_with(chunk_texts)
+                    mock_store.assert_awaited_once_with(
+                        chunk_texts, chunk_metadatas, embeddings, test_document_id, "test-user"
+                    )
 
 
 @pytest.mark.asyncio
@@ -317,3 +399,105 @@ async def test_analyze_document(test_document_id):
                 assert result["analysis_type"] == "summary"
                 assert result["analysis"] == "This is a summary of the document."
                 assert result["chunk_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_combines_documents():
+    """Test that documents embedded at the same time share one embeddings call."""
+    batcher = openai_service.EmbeddingBatcher(max_wait=0.05)
+    
+    async def embed(texts, dtype, rejected):
+        return np.arange(len(texts), dtype=dtype).reshape(-1, 1).repeat(1536, axis=1)
+    
+    with patch('app.services.openai_service.generate_embeddings', side_effect=embed) as mock_embeddings:
+        first, second = await asyncio.gather(
+            batcher.embed(["a", "b"]),
+            batcher.embed(["c"])
+        )
+    await batcher.close()
+    
+    mock_embeddings.assert_called_once()
+    assert first.shape == (2, 1536)
+    assert second.shape == (1, 1536)
+    assert second[0][0] == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_fails_all_documents_without_retrying():
+    """Test that a failed combined call is not retried document by document."""
+    batcher = openai_service.EmbeddingBatcher(max_wait=0.05)
+    
+    with patch('app.services.openai_service.generate_embeddings', side_effect=Exception("Rate limited")) as mock_embeddings:
+        results = await asyncio.gather(
+            batcher.embed(["a"]),
+            batcher.embed(["b"]),
+            return_exceptions=True
+        )
+    await batcher.close()
+    
+    mock_embeddings.assert_called_once()
+    assert all(isinstance(result, Exception) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_reports_rejected_inputs_per_document():
+    """Test that rejected inputs fail only the document they belong to."""
+    batcher = openai_service.EmbeddingBatcher(max_wait=0.05)
+    
+    async def embed(texts, dtype, rejected):
+        # Index 3 of the combined batch is the second text of the second document
+        rejected.append(3)
+        return np.ones((len(texts), 1536), dtype=dtype)
+    
+    with patch('app.services.openai_service.generate_embeddings', side_effect=embed):
+        first, second = await asyncio.gather(
+            batcher.embed(["a", "b"]),
+            batcher.embed(["c", "too long"]),
+            return_exceptions=True
+        )
+    await batcher.close()
+    
+    assert first.shape == (2, 1536)
+    assert isinstance(second, openai_service.EmbeddingInputsRejected)
+    assert second.rejected == [1]
+    assert second.embeddings.shape == (2, 1536)
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_large_flush_does_not_block_others():
+    """Test that a slow flush for one document does not hold back the next flush."""
+    batcher = openai_service.EmbeddingBatcher(max_tokens=1, max_wait=0.05)
+    release_large = asyncio.Event()
+    
+    async def embed(texts, dtype, rejected):
+        if texts == ["large"]:
+            await release_large.wait()
+        return np.ones((len(texts), 1536), dtype=dtype)
+    
+    with patch('app.services.openai_service.generate_embeddings', side_effect=embed):
+        large = asyncio.ensure_future(batcher.embed(["large"]))
+        await asyncio.sleep(0.01)
+        small = await asyncio.wait_for(batcher.embed(["small"]), timeout=1)
+        assert not large.done()
+        release_large.set()
+        await large
+    await batcher.close()
+    
+    assert small.shape == (1, 1536)
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_close_cancels_pending_requests():
+    """Test that closing the batcher cancels documents still waiting for embeddings."""
+    batcher = openai_service.EmbeddingBatcher(max_tokens=1, max_wait=0.05)
+    
+    async def embed(texts, dtype, rejected):
+        await asyncio.Event().wait()
+    
+    with patch('app.services.openai_service.generate_embeddings', side_effect=embed):
+        pending = asyncio.ensure_future(batcher.embed(["a"]))
+        await asyncio.sleep(0.01)
+        await batcher.close()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await pending
@@ -1,19 +1,34 @@
-import requests
 import os
-import json
 import sys
-from unittest.mock import patch, MagicMock
+from functools import lru_cache
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import Depends, HTTPException, status
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
 
 # Add the parent directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app.services.auth import create_access_token
-from app.models.user import UserRole
+from app.main import app
+from app.core.config import settings
+from app.services.auth import create_access_token, get_current_user, oauth2_scheme
+from app.models.user import User, UserRole
+
+# Exercise the routes in-process instead of over the network against the deployment
+client = TestClient(app)
 
-# Use the deployed endpoint
-API_BASE_URL = "https://doztra-research-backend-gi8q.onrender.com"
+OPTION_ENDPOINTS = [
+    "/api/research/options/academic-disciplines",
+    "/api/research/options/academic-levels",
+    "/api/research/options/target-audiences",
+    "/api/research/options/research-methodologies",
+    "/api/research/options/countries"
+]
 
 
+@lru_cache(maxsize=1)
 def get_user_token():
     """Create a test user token"""
     return create_access_token(
@@ -21,6 +36,7 @@ def get_user_token():
     )
 
 
+@lru_cache(maxsize=1)
 def get_admin_token():
     """Create a test admin token"""
     return create_access_token(
@@ -28,17 +44,58 @@ def get_admin_token():
     )
 
 
-def test_get_academic_disciplines():
+async def _user_from_token(token: str = Depends(oauth2_scheme)):
+    """Build the current user from the token's claims instead of loading it from the database"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    user = MagicMock(spec=User)
+    user.id = payload["sub"]
+    user.email = payload.get("email")
+    user.role = UserRole[payload.get("role", "USER").upper()]
+    user.is_active = True
+    return user
+
+
+@pytest.fixture(scope="module", autouse=True)
+def token_auth():
+    """Authenticate requests from their bearer token for every test in this module"""
+    app.dependency_overrides[get_current_user] = _user_from_token
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture(scope="module")
+def user_token():
+    """Token for a regular user, signed once per module"""
+    return get_user_token()
+
+
+@pytest.fixture(scope="module")
+def admin_token():
+    """Token for an admin user, signed once per module"""
+    return get_admin_token()
+
+
+@pytest.fixture(scope="module")
+def user_headers(user_token):
+    """Authorization header for a regular user, built once per module"""
+    return {"Authorization": f"Bearer {user_token}"}
+
+
+@pytest.fixture(scope="module")
+def admin_headers(admin_token):
+    """Authorization header for an admin user, built once per module"""
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
+def test_get_academic_disciplines(user_headers):
     """Test getting academic disciplines"""
-    # Set up headers with authentication
-    headers = {
-        "Authorization": f"Bearer {user_token}"
-    }
-    
-    # Make request to the deployed endpoint
-    response = requests.get(
-        f"{API_BASE_URL}/api/research/options/disciplines",
-        headers=headers
+    # Make request to the endpoint
+    response = client.get(
+        "/api/research/options/academic-disciplines",
+        headers=user_headers
     )
     
     # Print response for debugging
@@ -71,17 +128,12 @@ def test_get_academic_disciplines():
         print("Available disciplines:", values)
 
 
-def test_get_academic_levels(user_token):
+def test_get_academic_levels(user_headers):
     """Test getting academic levels"""
-    # Set up headers with authentication
-    headers = {
-        "Authorization": f"Bearer {user_token}"
-    }
-    
-    # Make request to the deployed endpoint
-    response = requests.get(
-        f"{API_BASE_URL}/api/research/options/academic-levels",
-        headers=headers
+    # Make request to the endpoint
+    response = client.get(
+        "/api/research/options/academic-levels",
+        headers=user_headers
     )
     
     # Print response for debugging
@@ -116,17 +168,12 @@ def test_get_academic_levels(user_token):
         assert False, "Unexpected response structure"
 
 
-def test_get_target_audiences(user_token):
+def test_get_target_audiences(user_headers):
     """Test getting target audiences"""
-    # Set up headers with authentication
-    headers = {
-        "Authorization": f"Bearer {user_token}"
-    }
-    
-    # Make request to the deployed endpoint
-    response = requests.get(
-        f"{API_BASE_URL}/api/research/options/target-audiences",
-        headers=headers
+    # Make request to the endpoint
+    response = client.get(
+        "/api/research/options/target-audiences",
+        headers=user_headers
     )
     
     # Print response for debugging
@@ -156,17 +203,12 @@ def test_get_target_audiences(user_token):
         assert False, "Unexpected response structure"
 
 
-def test_get_research_methodologies(user_token):
+def test_get_research_methodologies(user_headers):
     """Test getting research methodologies"""
-    # Set up headers with authentication
-    headers = {
-        "Authorization": f"Bearer {user_token}"
-    }
-    
-    # Make request to the deployed endpoint
-    response = requests.get(
-        f"{API_BASE_URL}/api/research/options/research-methodologies",
-        headers=headers
+    # Make request to the endpoint
+    response = client.get(
+        "/api/research/options/research-methodologies",
+        headers=user_headers
     )
     
     # Print response for debugging
@@ -196,17 +238,12 @@ def test_get_research_methodologies(user_token):
         assert False, "Unexpected response structure"
 
 
-def test_get_countries(user_token):
+def test_get_countries(user_headers):
     """Test getting countries"""
-    # Set up headers with authentication
-    headers = {
-        "Authorization": f"Bearer {user_token}"
-    }
-    
-    # Make request to the deployed endpoint
-    response = requests.get(
-        f"{API_BASE_URL}/api/research/options/countries",
-        headers=headers
+    # Make request to the endpoint
+    response = client.get(
+        "/api/research/options/countries",
+        headers=user_headers
     )
     
     # Print response for debugging
@@ -238,56 +275,35 @@ def test_get_countries(user_token):
         assert False, "Unexpected response structure"
 
 
-def test_unauthorized_access():
+@pytest.mark.parametrize("endpoint", OPTION_ENDPOINTS)
+def test_unauthorized_access(endpoint):
     """Test unauthorized access to endpoints"""
-    endpoints = [
-        "/api/research/options/disciplines",
-        "/api/research/options/academic-levels",
-        "/api/research/options/target-audiences",
-        "/api/research/options/research-methodologies",
-        "/api/research/options/countries"
-    ]
+    # Make request without auth token
+    print(f"\nTesting unauthorized access to: {endpoint}")
+    response = client.get(endpoint)
     
-    for endpoint in endpoints:
-        # Make request to the deployed endpoint without auth token
-        print(f"\nTesting unauthorized access to: {endpoint}")
-        response = requests.get(f"{API_BASE_URL}{endpoint}")
-        
-        # Print response for debugging
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.text}")
-        
-        # Assert response
-        assert response.status_code in [401, 403]  # Either unauthorized or forbidden
-        
-        try:
-            data = response.json()
-            if "detail" in data:
-                print(f"Error detail: {data['detail']}")
-        except Exception as e:
-            print(f"Could not parse response as JSON: {e}")
-            # Continue even if the response is not JSON
+    # Print response for debugging
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.text}")
+    
+    # Assert response
+    assert response.status_code in [401, 403]  # Either unauthorized or forbidden
+    
+    try:
+        data = response.json()
+        if "detail" in data:
+            print(f"Error detail: {data['detail']}")
+    except Exception as e:
+        print(f"Could not parse response as JSON: {e}")
+        # Continue even if the response is not JSON
 
 
-def test_admin_access(admin_token):
+def test_admin_access(admin_headers):
     """Test that admin users can access the endpoints"""
-    endpoints = [
-        "/api/research/options/disciplines",
-        "/api/research/options/academic-levels",
-        "/api/research/options/target-audiences",
-        "/api/research/options/research-methodologies",
-        "/api/research/options/countries"
-    ]
-    
-    for endpoint in endpoints:
-        # Set up headers with admin authentication
-        headers = {
-            "Authorization": f"Bearer {admin_token}"
-        }
-        
-        # Make request to the deployed endpoint
+    for endpoint in OPTION_ENDPOINTS:
+        # Make request to the endpoint
         print(f"\nTesting admin access to: {endpoint}")
-        response = requests.get(f"{API_BASE_URL}{endpoint}", headers=headers)
+        response = client.get(endpoint, headers=admin_headers)
         
         # Print response for debugging
         print(f"Status Code: {response.status_code}")
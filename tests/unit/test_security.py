@@ -0,0 +1,48 @@
+import base64
+
+import pytest
+from unittest.mock import patch
+
+from app.utils.security import (
+    encrypt_oauth_token,
+    decrypt_oauth_token,
+    validate_oauth_token_key,
+)
+
+
+class TestOAuthTokenEncryption:
+    """Test suite for OAuth token encryption helpers"""
+
+    def test_round_trip(self):
+        """Test an encrypted token decrypts back to the original"""
+        blob = encrypt_oauth_token("ya29.token")
+        assert blob != b"ya29.token"
+        assert decrypt_oauth_token(blob) == "ya29.token"
+
+    def test_decrypt_with_rotated_key_returns_none(self):
+        """Test a token encrypted under another key decrypts to None instead of raising"""
+        with patch("app.utils.security.settings.OAUTH_TOKEN_ENCRYPTION_KEY",
+                   base64.urlsafe_b64encode(b"a" * 32).decode()):
+            blob = encrypt_oauth_token("ya29.token")
+        with patch("app.utils.security.settings.OAUTH_TOKEN_ENCRYPTION_KEY",
+                   base64.urlsafe_b64encode(b"b" * 32).decode()):
+            assert decrypt_oauth_token(blob) is None
+
+    def test_validate_key_accepts_32_bytes(self):
+        """Test a 32-byte key passes startup validation"""
+        with patch("app.utils.security.settings.OAUTH_TOKEN_ENCRYPTION_KEY",
+                   base64.urlsafe_b64encode(b"k" * 32).decode()):
+            validate_oauth_token_key()
+
+    def test_validate_key_rejects_wrong_length(self):
+        """Test a key that does not decode to 32 bytes fails startup validation"""
+        with patch("app.utils.security.settings.OAUTH_TOKEN_ENCRYPTION_KEY",
+                   base64.urlsafe_b64encode(b"k" * 16).decode()):
+            with pytest.raises(ValueError, match="32 bytes"):
+                validate_oauth_token_key()
+
+    def test_validate_key_rejects_invalid_base64(self):
+        """Test a key that is not base64 fails startup validation"""
+        with patch("app.utils.security.settings.OAUTH_TOKEN_ENCRYPTION_KEY", "not base64!"):
+            with pytest.raises(ValueError, match="base64"):
+                validate_oauth_token_key()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the upload persistence helpers.
+"""
+
+import io
+import hashlib
+import tempfile
+
+import pytest
+from fastapi import UploadFile
+
+from app.utils import uploads
+from app.utils.uploads import save_upload_file
+
+
+BODY = b"0123456789" * 1000
+
+
+@pytest.mark.asyncio
+async def test_save_upload_file_in_memory(tmp_path):
+    """Test that an in-memory upload is streamed to disk and hashed."""
+    upload = UploadFile(file=io.BytesIO(BODY), filename="test.txt")
+    hasher = hashlib.sha256()
+    target = tmp_path / "test.txt"
+    
+    size = await save_upload_file(upload, target, hasher)
+    
+    assert size == len(BODY)
+    assert target.read_bytes() == BODY
+    assert hasher.hexdigest() == hashlib.sha256(BODY).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_save_upload_file_streams_in_chunks(tmp_path, monkeypatch):
+    """Test that uploads larger than one chunk are written completely."""
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 64)
+    upload = UploadFile(file=io.BytesIO(BODY), filename="test.txt")
+    target = tmp_path / "test.txt"
+    
+    size = await save_upload_file(upload, target)
+    
+    assert size == len(BODY)
+    assert target.read_bytes() == BODY
+
+
+def _rolled_upload():
+    spooled = tempfile.SpooledTemporaryFile(max_size=16)
+    spooled.write(BODY)
+    spooled.seek(0)
+    assert spooled._rolled
+    return UploadFile(file=spooled, filename="test.txt")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(uploads.os, "sendfile"), reason="os.sendfile is not available")
+async def test_save_upload_file_spooled_to_disk_uses_sendfile(tmp_path, monkeypatch):
+    """Test that an upload Starlette spooled to disk is copied with sendfile."""
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 64)
+    upload = _rolled_upload()
+    target = tmp_path / "test.txt"
+    sendfile_calls = []
+    real_sendfile = uploads.os.sendfile
+    
+    def sendfile(*args):
+        sendfile_calls.append(args)
+        return real_sendfile(*args)
+    
+    monkeypatch.setattr(uploads.os, "sendfile", sendfile)
+    size = await save_upload_file(upload, target)
+    upload.file.close()
+    
+    assert sendfile_calls
+    assert size == len(BODY)
+    assert target.read_bytes() == BODY
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(uploads.os, "sendfile"), reason="os.sendfile is not available")
+async def test_save_upload_file_spooled_to_disk_hashes_in_one_pass(tmp_path, monkeypatch):
+    """Test that hashing a spooled upload reads it once instead of sendfile plus a read-back."""
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 64)
+    upload = _rolled_upload()
+    hasher = hashlib.sha256()
+    target = tmp_path / "test.txt"
+    bytes_read = []
+    real_pread = uploads.os.pread
+    
+    def pread(*args):
+        chunk = real_pread(*args)
+        bytes_read.append(len(chunk))
+        return chunk
+    
+    def sendfile(*args):
+        raise AssertionError("sendfile should not be used when hashing")
+    
+    monkeypatch.setattr(uploads.os, "pread", pread)
+    monkeypatch.setattr(uploads.os, "sendfile", sendfile)
+    size = await save_upload_file(upload, target, hasher)
+    upload.file.close()
+    
+    assert sum(bytes_read) == len(BODY)
+    assert size == len(BODY)
+    assert target.read_bytes() == BODY
+    assert hasher.hexdigest() == hashlib.sha256(BODY).hexdigest()